@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 import structlog
 from structlog.processors import JSONRenderer, TimeStamper, add_log_level
-from structlog.stdlib import LoggerFactory
+from structlog.stdlib import LoggerFactory as StdlibLoggerFactory
 
 
 class StructuredLogger:
@@ -38,7 +38,7 @@ class StructuredLogger:
                 JSONRenderer()
             ],
             context_class=dict,
-            logger_factory=LoggerFactory(),
+            logger_factory=StdlibLoggerFactory(),
             cache_logger_on_first_use=True,
         )
         
@@ -180,6 +180,9 @@ class StructuredLogger:
             reason: Reason for application/non-application
             **kwargs: Additional data
         """
+        if not self.is_enabled_for(logging.INFO):
+            return
+        
         self.log_operation(
             "rule_application",
             {
@@ -211,21 +214,32 @@ class StructuredLogger:
             **kwargs
         )
     
-    def debug(self, message: str, **kwargs) -> None:
-        """Log debug message."""
-        self.logger.debug(message, **kwargs)
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether messages at a level would be emitted.
+        
+        Args:
+            level: Standard logging level (e.g. logging.INFO)
+            
+        Returns:
+            True if the underlying logger is enabled for the level
+        """
+        return logging.getLogger(self.module_name).isEnabledFor(level)
+    
+    def debug(self, message: str, *args, **kwargs) -> None:
+        """Log debug message, %-formatting any args only if it is emitted."""
+        self.logger.debug(message, *args, **kwargs)
     
-    def info(self, message: str, **kwargs) -> None:
-        """Log info message."""
-        self.logger.info(message, **kwargs)
+    def info(self, message: str, *args, **kwargs) -> None:
+        """Log info message, %-formatting any args only if it is emitted."""
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message: str, **kwargs) -> None:
-        """Log warning message."""
-        self.logger.warning(message, **kwargs)
+    def warning(self, message: str, *args, **kwargs) -> None:
+        """Log warning message, %-formatting any args only if it is emitted."""
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str, **kwargs) -> None:
-        """Log error message."""
-        self.logger.error(message, **kwargs)
+    def error(self, message: str, *args, **kwargs) -> None:
+        """Log error message, %-formatting any args only if it is emitted."""
+        self.logger.error(message, *args, **kwargs)
 
 
 class LoggerFactory:
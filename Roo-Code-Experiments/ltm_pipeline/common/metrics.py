@@ -1,7 +1,7 @@
 """Metrics collection and calculation for the LTM pipeline."""
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, FrozenSet
 import json
 from datetime import datetime
 from pathlib import Path
@@ -58,6 +58,19 @@ class MetricsCollector:
             }
         )
         self.metrics.append(result)
+    
+    def record_many(self, values: Dict[str, float], **metadata) -> None:
+        """Record several metrics that share the same metadata.
+        
+        Args:
+            values: Mapping of metric name to value, recorded in order
+            **metadata: Additional metadata applied to every metric
+        """
+        shared_metadata = {"module": self.module_name, **metadata}
+        self.metrics.extend(
+            MetricResult(metric_name=name, value=value, metadata=dict(shared_metadata))
+            for name, value in values.items()
+        )
         
     def calculate_precision_recall_f1(
         self, 
@@ -124,7 +137,10 @@ class MetricsCollector:
         self,
         retrieved: List[str],
         relevant: List[str],
-        total_available: int
+        total_available: int,
+        *,
+        retrieved_set: Optional[FrozenSet[str]] = None,
+        relevant_set: Optional[FrozenSet[str]] = None
     ) -> Dict[str, float]:
         """Calculate retrieval metrics.
         
@@ -132,12 +148,16 @@ class MetricsCollector:
             retrieved: List of retrieved item IDs
             relevant: List of relevant item IDs
             total_available: Total number of items available
+            retrieved_set: Optional precomputed set of the retrieved IDs
+            relevant_set: Optional precomputed set of the relevant IDs
             
         Returns:
             Dictionary with retrieval metrics
         """
-        retrieved_set = set(retrieved)
-        relevant_set = set(relevant)
+        if retrieved_set is None:
+            retrieved_set = set(retrieved)
+        if relevant_set is None:
+            relevant_set = set(relevant)
         
         true_positives = len(retrieved_set & relevant_set)
         false_positives = len(retrieved_set - relevant_set)
@@ -375,30 +395,27 @@ class EvaluationMetrics:
             Tuple of (matches, unmatched_extracted, unmatched_ground_truth)
         """
         matches = []
-        matched_extracted = set()
-        matched_ground_truth = set()
+        unmatched_extracted = []
+        
+        # Ground truth indices still available, in ascending order; matched
+        # ones are removed instead of being skipped for every extracted rule
+        unmatched_ground_truth = list(range(len(ground_truth)))
         
         # Find best matches
         for i, ext_rule in enumerate(extracted):
             best_match = -1
             best_score = 0.0
             
-            for j, gt_rule in enumerate(ground_truth):
-                if j in matched_ground_truth:
-                    continue
-                    
-                score = EvaluationMetrics.calculate_rule_similarity(ext_rule, gt_rule)
+            for j in unmatched_ground_truth:
+                score = EvaluationMetrics.calculate_rule_similarity(ext_rule, ground_truth[j])
                 if score > best_score and score >= similarity_threshold:
                     best_score = score
                     best_match = j
             
             if best_match >= 0:
                 matches.append((i, best_match))
-                matched_extracted.add(i)
-                matched_ground_truth.add(best_match)
-        
-        # Find unmatched
-        unmatched_extracted = [i for i in range(len(extracted)) if i not in matched_extracted]
-        unmatched_ground_truth = [j for j in range(len(ground_truth)) if j not in matched_ground_truth]
+                unmatched_ground_truth.remove(best_match)
+            else:
+                unmatched_extracted.append(i)
         
         return matches, unmatched_extracted, unmatched_ground_truth
\ No newline at end of file
@@ -1,12 +1,27 @@
 """Core data models for the LTM pipeline."""
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime
 from enum import Enum
 import uuid
 
 
+# Sentinel for derived values not computed yet
+_MISSING = object()
+
+# Bumped when a field of an existing MatchCriteria or Action is reassigned;
+# Rule.derived drops values computed before the last bump
+_component_revision = [0]
+
+
+def _set_component_field(component: Any, name: str, value: Any) -> None:
+    """Set a MatchCriteria or Action field, invalidating derived rule values on reassignment."""
+    if name in component.__dict__:
+        _component_revision[0] += 1
+    object.__setattr__(component, name, value)
+
+
 class RuleType(Enum):
     """Classification of rule types in transcripts."""
     PERSISTENT = "persistent"
@@ -36,6 +51,8 @@ class MatchCriteria:
     value: str
     context: Optional[Dict[str, Any]] = None
     
+    __setattr__ = _set_component_field
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation."""
         return {
@@ -61,6 +78,8 @@ class Action:
     description: str
     parameters: Optional[Dict[str, Any]] = None
     
+    __setattr__ = _set_component_field
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation."""
         return {
@@ -91,6 +110,48 @@ class Rule:
     timestamp: datetime = field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a field, dropping every value cached by derived()."""
+        self.__dict__.pop("_derived", None)
+        object.__setattr__(self, name, value)
+    
+    def derived(self, name: str, compute: Callable[['Rule'], Any]) -> Any:
+        """Get a value derived from the rule's fields, computed on first use.
+        
+        This is the one place pipeline components cache per-rule values
+        (keyword sets, serialized forms). Cached values are dropped when a
+        field of the rule is reassigned, and a reassigned match criteria or
+        action field drops the values of every rule. Dictionary fields
+        (context, parameters, metadata) changed in place are not detected;
+        call clear_derived() after doing so.
+        
+        Args:
+            name: Name of the derived value, unique per kind of value
+            compute: Function computing the value from the rule
+            
+        Returns:
+            The derived value, shared by every caller until the rule changes
+        """
+        cache = self.__dict__.get("_derived")
+        revision = _component_revision[0]
+        if cache is None or cache[0] != revision:
+            cache = self.__dict__["_derived"] = (revision, {})
+        values = cache[1]
+        value = values.get(name, _MISSING)
+        if value is _MISSING:
+            value = values[name] = compute(self)
+        return value
+    
+    def clear_derived(self) -> None:
+        """Drop every value cached by derived()."""
+        self.__dict__.pop("_derived", None)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the rule's fields without its derived values."""
+        state = self.__dict__.copy()
+        state.pop("_derived", None)
+        return state
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation."""
         return {
@@ -117,6 +178,49 @@ class Rule:
             timestamp=datetime.fromisoformat(data["timestamp"]) if "timestamp" in data else datetime.utcnow(),
             metadata=data.get("metadata", {})
         )
+    
+    def to_tuple(self) -> tuple:
+        """Convert to a flat positional representation, ordered as RULE_TUPLE_FIELDS."""
+        match_criteria, action = self.match_criteria, self.action
+        return (
+            self.id,
+            match_criteria.type.value if match_criteria else None,
+            match_criteria.value if match_criteria else None,
+            match_criteria.context if match_criteria else None,
+            action.type.value if action else None,
+            action.description if action else None,
+            action.parameters if action else None,
+            self.rationale,
+            self.confidence,
+            self.source_id,
+            self.timestamp.isoformat(),
+            self.metadata
+        )
+    
+    @classmethod
+    def from_tuple(cls, row: Any) -> 'Rule':
+        """Create from a positional representation produced by to_tuple."""
+        (rule_id, match_type, match_value, match_context, action_type, action_description,
+         action_parameters, rationale, confidence, source_id, timestamp, metadata) = row
+        return cls(
+            id=rule_id,
+            match_criteria=MatchCriteria(MatchType(match_type), match_value, match_context)
+                if match_type is not None else None,
+            action=Action(ActionType(action_type), action_description, action_parameters)
+                if action_type is not None else None,
+            rationale=rationale,
+            confidence=confidence,
+            source_id=source_id,
+            timestamp=datetime.fromisoformat(timestamp),
+            metadata=metadata
+        )
+
+
+# Field order of Rule.to_tuple, recorded in compact snapshots
+RULE_TUPLE_FIELDS = (
+    "id", "match_type", "match_value", "match_context", "action_type", "action_description",
+    "action_parameters", "rationale", "confidence", "source_id", "timestamp", "metadata"
+)
 
 
 @dataclass
@@ -238,12 +342,59 @@ class StorageDecision:
         }
 
 
+# Change type -> key its items are serialized under
+_CHANGE_ITEMS_KEYS = {
+    "naming_convention": "affected_items",
+    "style": "style_rules",
+    "structure": "organization",
+    "behavior": "behaviors"
+}
+
+
+@dataclass
+class Change:
+    """A single change produced by applying a rule."""
+    __slots__ = ("type", "items", "convention")
+    type: str  # "naming_convention", "style", "structure" or "behavior"
+    items: List[Dict[str, Any]]
+    convention: Optional[str]  # Only set for naming convention changes
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        data: Dict[str, Any] = {"type": self.type}
+        if self.convention is not None:
+            data["convention"] = self.convention
+        data[_CHANGE_ITEMS_KEYS.get(self.type, "items")] = self.items
+        return data
+
+
+@dataclass
+class Modification:
+    """Modification made to a task by applying a rule."""
+    __slots__ = ("rule_id", "action_type", "description", "timestamp", "changes")
+    rule_id: str
+    action_type: str
+    description: str
+    timestamp: datetime
+    changes: List[Change]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        return {
+            "rule_id": self.rule_id,
+            "action_type": self.action_type,
+            "description": self.description,
+            "timestamp": self.timestamp.isoformat(),
+            "changes": [change.to_dict() for change in self.changes]
+        }
+
+
 @dataclass
 class ApplicationResult:
     """Result of applying rules to a task."""
     task_id: str
     applied_rules: List[str] = field(default_factory=list)
-    modifications: List[Dict[str, Any]] = field(default_factory=list)
+    modifications: List[Modification] = field(default_factory=list)
     skipped_rules: List[str] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
     timestamp: datetime = field(default_factory=datetime.utcnow)
@@ -253,7 +404,7 @@ class ApplicationResult:
         return {
             "task_id": self.task_id,
             "applied_rules": self.applied_rules,
-            "modifications": self.modifications,
+            "modifications": [mod.to_dict() for mod in self.modifications],
             "skipped_rules": self.skipped_rules,
             "errors": self.errors,
             "timestamp": self.timestamp.isoformat()
@@ -234,19 +234,21 @@ class TaskRunner:
         naming_convention = "camelCase"  # default
         if application_result:
             for mod in application_result.modifications:
-                if mod.get("action_type") == "naming":
-                    for change in mod.get("changes", []):
-                        if "convention" in change:
-                            naming_convention = change["convention"]
+                if mod.action_type == "naming":
+                    for change in mod.changes:
+                        if change.convention is not None:
+                            naming_convention = change.convention
                             break
         
         # Determine style based on rules
         indentation = "4 spaces"  # default
         if application_result:
             for mod in application_result.modifications:
-                if mod.get("action_type") == "style":
-                    for change in mod.get("changes", []):
-                        for rule in change.get("style_rules", []):
+                if mod.action_type == "style":
+                    for change in mod.changes:
+                        if change.type != "style":
+                            continue
+                        for rule in change.items:
                             if rule["rule"] == "indentation":
                                 indentation = rule["value"]
         
@@ -1,30 +1,134 @@
 """Rule application module for applying retrieved rules to tasks."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet, Callable
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import lru_cache
 import re
 
-from ..common.models import Rule, Task, ApplicationResult
+from ..common.models import Rule, Task, ApplicationResult, Modification, Change
 from ..common.logger import get_logger
 from ..common.metrics import MetricsCollector
 from .ltm_storage import SimulatedLTMStorage
 from .retriever import RuleRetriever
 
 
+# Sentinel for context keys missing from a task
+_MISSING = object()
+
+# Splits camelCase/PascalCase identifiers into their component words
+_WORD_SPLIT_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?=[A-Z][a-z]|\b)')
+
+# Naming convention -> function joining split words into that convention
+_CONVENTION_JOINERS: Dict[str, Callable[[List[str]], str]] = {
+    "camelCase": lambda words: words[0].lower() + ''.join(w.capitalize() for w in words[1:]),
+    "snake_case": lambda words: '_'.join(w.lower() for w in words),
+    "PascalCase": lambda words: ''.join(w.capitalize() for w in words),
+    "kebab-case": lambda words: '-'.join(w.lower() for w in words)
+}
+
+
+@lru_cache(maxsize=4096)
+def _convert_name(name: str, convention: str) -> str:
+    """Convert a name to a naming convention, memoized across rules and tasks."""
+    join = _CONVENTION_JOINERS.get(convention)
+    if join is None:
+        return name
+    
+    # Split name into words
+    words = _WORD_SPLIT_RE.findall(name) or name.split('_')
+    return join(words)
+
+
+def _copy_modification(modification: Modification, timestamp: datetime) -> Modification:
+    """Copy a modification down to its change items, with a new timestamp."""
+    return replace(modification, timestamp=timestamp, changes=[
+        replace(change, items=[dict(item) for item in change.items])
+        for change in modification.changes
+    ])
+
+
+@dataclass(frozen=True)
+class _TaskView:
+    """Lowercased task text shared by every rule checked against one task."""
+    language: str     # Task language
+    description: str  # Task description
+    context: str      # Task context repr, empty if the task has no context
+    text: str         # Description and context repr, used for keyword matching
+    key: Tuple[str, ...]  # Fingerprint of the task fields rule decisions depend on
+    
+    @classmethod
+    def of(cls, task: Task) -> '_TaskView':
+        """Build the view for a task."""
+        context_str = str(task.context)
+        return cls(
+            language=task.language.lower(),
+            description=task.description.lower(),
+            context=context_str.lower() if task.context else "",
+            text=f"{task.description} {context_str}".lower(),
+            key=(task.type, task.language, task.description, context_str)
+        )
+
+
 class RuleApplicator:
     """Apply retrieved rules to tasks."""
     
-    def __init__(self, ltm_storage: SimulatedLTMStorage, retriever: Optional[RuleRetriever] = None):
+    # Action type -> name of the method that simulates applying it
+    _ACTION_DISPATCH = {
+        "naming": "_apply_naming_rule",
+        "style": "_apply_style_rule",
+        "structure": "_apply_structure_rule",
+        "behavior": "_apply_behavior_rule"
+    }
+    
+    # Applicability matrix: action type -> task types it applies to
+    _APPLICABILITY: Dict[str, FrozenSet[str]] = {
+        "naming": frozenset({"code_generation", "refactoring"}),
+        "style": frozenset({"code_generation", "refactoring", "formatting"}),
+        "structure": frozenset({"code_generation", "refactoring", "organization"}),
+        "behavior": frozenset({"code_generation", "debugging", "optimization"})
+    }
+    
+    # Structure rules: (keyword, pattern, summary); a None summary echoes the rule description
+    _STRUCTURE_KEYWORDS: Tuple[Tuple[str, str, Optional[str]], ...] = (
+        ("separate", "separation", "Separate components into individual files"),
+        ("group", "grouping", "Group related items together"),
+        ("organize", "organization", None)
+    )
+    
+    # Behavior rules: (keyword, action, summary)
+    _BEHAVIOR_KEYWORDS: Tuple[Tuple[str, str, str], ...] = (
+        ("validate", "validation", "Add input validation"),
+        ("log", "logging", "Add logging statements"),
+        ("error", "error_handling", "Add error handling"),
+        ("test", "testing", "Add test cases")
+    )
+    
+    def __init__(self, ltm_storage: SimulatedLTMStorage, retriever: Optional[RuleRetriever] = None,
+                 decision_cache_size: int = 50000, hot_rule_threshold: int = 100):
         """Initialize the rule applicator.
         
         Args:
             ltm_storage: LTM storage instance
             retriever: Optional retriever instance (will create if not provided)
+            decision_cache_size: Maximum number of (rule, task) decisions to memoize
+            hot_rule_threshold: Evaluations after which a rule gets a specialized predicate
         """
         self.logger = get_logger("RuleApplicator")
         self.metrics = MetricsCollector("rule_application")
         self.storage = ltm_storage
         self.retriever = retriever or RuleRetriever(ltm_storage)
+        
+        # LRU memo of (rule key, task key) -> (should_apply, reason, modification)
+        self.decision_cache_size = decision_cache_size
+        self._decision_cache: "OrderedDict[Tuple, Tuple[bool, str, Optional[Modification]]]" = OrderedDict()
+        
+        # Rule key -> evaluation count, and specialized predicates for hot rules;
+        # both are LRU maps bounded like the decision cache
+        self.hot_rule_threshold = hot_rule_threshold
+        self._rule_evaluations: "OrderedDict[Tuple, int]" = OrderedDict()
+        self._hot_predicates: "OrderedDict[Tuple, Callable[[Task, _TaskView], Tuple[bool, str]]]" = OrderedDict()
     
     def apply_rules_to_task(self, task: Task, rules: Optional[List[Rule]] = None) -> ApplicationResult:
         """Apply relevant rules to a task.
@@ -42,18 +146,18 @@ class RuleApplicator:
         if rules is None:
             rules = self.retriever.retrieve_for_task(task)
         
-        self.logger.info(f"Applying {len(rules)} rules to task {task.id}")
+        self.logger.info("Applying %d rules to task %s", len(rules), task.id)
         
         # Initialize result
         result = ApplicationResult(task_id=task.id)
+        task_view = _TaskView.of(task)
         
         # Apply each rule
         for rule in rules:
             try:
-                should_apply, reason = self._should_apply_rule(rule, task)
+                should_apply, reason, modification = self._decide(rule, task, task_view)
                 
                 if should_apply:
-                    modification = self._apply_rule(rule, task)
                     if modification:
                         result.applied_rules.append(rule.id)
                         result.modifications.append(modification)
@@ -78,88 +182,214 @@ class RuleApplicator:
                 result.errors.append(error_msg)
                 self.logger.error(error_msg)
         
-        # Record metrics
-        application_time = (datetime.utcnow() - start_time).total_seconds()
-        self.metrics.record("application_time", application_time, task_id=task.id)
-        self.metrics.record("rules_applied", len(result.applied_rules), task_id=task.id)
-        self.metrics.record("rules_skipped", len(result.skipped_rules), task_id=task.id)
-        self.metrics.record("application_errors", len(result.errors), task_id=task.id)
+        # Record metrics in one batch
+        task_metrics = {
+            "application_time": (datetime.utcnow() - start_time).total_seconds(),
+            "rules_applied": len(result.applied_rules),
+            "rules_skipped": len(result.skipped_rules),
+            "application_errors": len(result.errors)
+        }
         
         # Calculate application rate
         if rules:
-            application_rate = len(result.applied_rules) / len(rules)
-            self.metrics.record("application_rate", application_rate, task_id=task.id)
+            task_metrics["application_rate"] = len(result.applied_rules) / len(rules)
+        
+        self.metrics.record_many(task_metrics, task_id=task.id)
         
-        self.logger.info(f"Applied {len(result.applied_rules)} rules to task {task.id}, "
-                        f"skipped {len(result.skipped_rules)}, errors: {len(result.errors)}")
+        self.logger.info("Applied %d rules to task %s, skipped %d, errors: %d",
+                         len(result.applied_rules), task.id,
+                         len(result.skipped_rules), len(result.errors))
         
         return result
     
-    def _should_apply_rule(self, rule: Rule, task: Task) -> Tuple[bool, str]:
-        """Determine if a rule should be applied to a task.
+    def _decide(self, rule: Rule, task: Task,
+                task_view: _TaskView) -> Tuple[bool, str, Optional[Modification]]:
+        """Decide whether to apply a rule and compute its modification, memoized.
         
         Args:
             rule: Rule to check
             task: Task to check against
+            task_view: Precomputed lowercased task text
             
+        Returns:
+            Tuple of (should_apply, reason, modification or None)
+        """
+        rule_key = self._rule_key(rule)
+        cache_key = (rule_key, task_view.key)
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self._decision_cache.move_to_end(cache_key)
+            should_apply, reason, modification = cached
+            if modification:
+                modification = _copy_modification(modification, datetime.utcnow())
+            return should_apply, reason, modification
+        
+        predicate = self._hot_predicates.get(rule_key)
+        if predicate is not None:
+            self._hot_predicates.move_to_end(rule_key)
+            should_apply, reason = predicate(task, task_view)
+        else:
+            should_apply, reason = self._should_apply_rule(rule, task, task_view)
+            evaluations = self._rule_evaluations.pop(rule_key, 0) + 1
+            if evaluations >= self.hot_rule_threshold:
+                self._hot_predicates[rule_key] = self._compile_hot_rule(rule)
+                if len(self._hot_predicates) > self.decision_cache_size:
+                    self._hot_predicates.popitem(last=False)
+            else:
+                self._rule_evaluations[rule_key] = evaluations
+                if len(self._rule_evaluations) > self.decision_cache_size:
+                    self._rule_evaluations.popitem(last=False)
+        
+        modification = self._apply_rule(rule, task) if should_apply else None
+        
+        # Rejected keyword rules are a single substring test - not worth a cache slot
+        if should_apply or rule.match_criteria.type.value != "keyword":
+            # The cache keeps its own copy, so callers may modify what they get
+            cached_modification = _copy_modification(modification, modification.timestamp) if modification else None
+            self._decision_cache[cache_key] = (should_apply, reason, cached_modification)
+            if len(self._decision_cache) > self.decision_cache_size:
+                self._decision_cache.popitem(last=False)
+        
+        return should_apply, reason, modification
+    
+    def _rule_key(self, rule: Rule) -> Tuple:
+        """Get the fingerprint of the rule fields decisions depend on.
+        
+        Rule IDs alone are not unique (merged rules keep their base rule's ID),
+        so the key also covers the match criteria and action. It is built from
+        the rule's current fields on every call, so a rule changed in place
+        gets a new key rather than its old decisions.
+        
+        Args:
+            rule: Rule to fingerprint
+            
+        Returns:
+            Hashable rule key
+        """
+        criteria, action = rule.match_criteria, rule.action
+        return (rule.id, criteria.type, criteria.value, repr(criteria.context),
+                action.type, action.description)
+    
+    def _should_apply_rule(self, rule: Rule, task: Task,
+                           task_view: Optional[_TaskView] = None) -> Tuple[bool, str]:
+        """Determine if a rule should be applied to a task.
+        
+        Args:
+            rule: Rule to check
+            task: Task to check against
+            task_view: Precomputed lowercased task text (built if not provided)
+        
         Returns:
             Tuple of (should_apply, reason)
         """
-        # Check language compatibility
-        if rule.match_criteria.context and "language" in rule.match_criteria.context:
-            rule_lang = rule.match_criteria.context["language"].lower()
-            if task.language and rule_lang != "general" and rule_lang != task.language.lower():
-                return False, f"Language mismatch: rule is for {rule_lang}, task is {task.language}"
+        if task_view is None:
+            task_view = _TaskView.of(task)
+        
+        # Check language compatibility first - it is the cheapest rejection
+        rule_lang = self._rule_language(rule)
+        task_language = task_view.language
+        if rule_lang is not None and task_language and rule_lang != "general" and rule_lang != task_language:
+            return False, f"Language mismatch: rule is for {rule_lang}, task is {task.language}"
+        
+        # Check if rule action is applicable
+        if not self._is_action_applicable(rule.action, task):
+            return False, f"Action type {rule.action.type.value} not applicable to task type {task.type}"
         
         # Check match criteria
-        if rule.match_criteria.type.value == "pattern":
+        match_type = rule.match_criteria.type.value
+        if match_type == "pattern":
             # Check if pattern matches task context
-            pattern = rule.match_criteria.value
-            if not self._pattern_matches_task(pattern, task):
-                return False, f"Pattern '{pattern}' does not match task context"
+            if not self._pattern_matches_task(rule.match_criteria.value.lower(), task, task_view):
+                return False, f"Pattern '{rule.match_criteria.value}' does not match task context"
         
-        elif rule.match_criteria.type.value == "keyword":
+        elif match_type == "keyword":
             # Check if keyword is relevant to task
             keyword = rule.match_criteria.value.lower()
-            task_text = f"{task.description} {str(task.context)}".lower()
-            if keyword not in task_text:
+            if keyword not in task_view.text:
                 return False, f"Keyword '{keyword}' not found in task"
         
-        elif rule.match_criteria.type.value == "context":
+        elif match_type == "context":
             # Check context match
             if not self._context_matches_task(rule.match_criteria.context, task):
                 return False, "Context criteria do not match task"
         
-        # Check if rule action is applicable
-        if not self._is_action_applicable(rule.action, task):
-            return False, f"Action type {rule.action.type.value} not applicable to task type {task.type}"
-        
         return True, "All criteria met"
     
-    def _pattern_matches_task(self, pattern: str, task: Task) -> bool:
+    def _compile_hot_rule(self, rule: Rule) -> Callable[[Task, _TaskView], Tuple[bool, str]]:
+        """Build a predicate equivalent to _should_apply_rule for one rule.
+        
+        The rule's language, applicability set, match value and rejection
+        reasons are resolved once and bound into the returned closure, so
+        only the task-dependent comparisons remain per call.
+        
+        Args:
+            rule: Rule to specialize
+            
+        Returns:
+            Function of (task, task_view) returning (should_apply, reason)
+        """
+        rule_lang = self._rule_language(rule)
+        check_language = rule_lang is not None and rule_lang != "general"
+        action_type = rule.action.type.value
+        allowed = self._APPLICABILITY.get(action_type)
+        
+        # Specialize the match criteria check
+        match_type = rule.match_criteria.type.value
+        value = rule.match_criteria.value.lower()
+        rule_context = rule.match_criteria.context
+        matches: Optional[Callable[[Task, _TaskView], bool]] = None
+        match_reason = ""
+        if match_type == "pattern":
+            matches = lambda task, view: value in view.description or value in view.context
+            match_reason = f"Pattern '{rule.match_criteria.value}' does not match task context"
+        elif match_type == "keyword":
+            matches = lambda task, view: value in view.text
+            match_reason = f"Keyword '{value}' not found in task"
+        elif match_type == "context" and rule_context:
+            matches = lambda task, view: self._context_matches_task(rule_context, task)
+            match_reason = "Context criteria do not match task"
+        
+        def predicate(task: Task, task_view: _TaskView) -> Tuple[bool, str]:
+            if check_language and task_view.language and task_view.language != rule_lang:
+                return False, f"Language mismatch: rule is for {rule_lang}, task is {task.language}"
+            if allowed is not None and task.type not in allowed:
+                return False, f"Action type {action_type} not applicable to task type {task.type}"
+            if matches is not None and not matches(task, task_view):
+                return False, match_reason
+            return True, "All criteria met"
+        
+        return predicate
+    
+    def _rule_language(self, rule: Rule) -> Optional[str]:
+        """Get the lowercased language a rule is restricted to.
+        
+        Args:
+            rule: Rule to inspect
+            
+        Returns:
+            Lowercased language, or None if the rule has no language constraint
+        """
+        context = rule.match_criteria.context
+        return context["language"].lower() if context and "language" in context else None
+    
+    def _pattern_matches_task(self, pattern: str, task: Task,
+                              task_view: Optional[_TaskView] = None) -> bool:
         """Check if a pattern matches the task.
         
         Args:
-            pattern: Pattern to match
+            pattern: Lowercased pattern to match
             task: Task to check
+            task_view: Precomputed lowercased task text (built if not provided)
             
         Returns:
             True if pattern matches
         """
-        # Simple pattern matching - could be enhanced with regex
-        pattern_lower = pattern.lower()
-        
-        # Check in description
-        if pattern_lower in task.description.lower():
-            return True
-        
-        # Check in context
-        if task.context:
-            context_str = str(task.context).lower()
-            if pattern_lower in context_str:
-                return True
+        if task_view is None:
+            task_view = _TaskView.of(task)
         
-        return False
+        # Simple pattern matching - could be enhanced with regex
+        # Check in description, then in context
+        return pattern in task_view.description or pattern in task_view.context
     
     def _context_matches_task(self, rule_context: Optional[Dict[str, Any]], task: Task) -> bool:
         """Check if rule context matches task.
@@ -174,19 +404,12 @@ class RuleApplicator:
         if not rule_context:
             return True
         
-        if not task.context:
+        task_context = task.context
+        if not task_context:
             return False
         
-        # Check each context requirement
-        for key, value in rule_context.items():
-            if key not in task.context:
-                return False
-            
-            # Simple equality check - could be enhanced
-            if task.context[key] != value:
-                return False
-        
-        return True
+        # Every required key must be present with an equal value
+        return all(task_context.get(key, _MISSING) == value for key, value in rule_context.items())
     
     def _is_action_applicable(self, action: Any, task: Task) -> bool:
         """Check if an action is applicable to a task.
@@ -198,25 +421,12 @@ class RuleApplicator:
         Returns:
             True if action is applicable
         """
-        action_type = action.type.value
-        task_type = task.type
-        
-        # Define applicability matrix
-        applicability = {
-            "naming": ["code_generation", "refactoring"],
-            "style": ["code_generation", "refactoring", "formatting"],
-            "structure": ["code_generation", "refactoring", "organization"],
-            "behavior": ["code_generation", "debugging", "optimization"]
-        }
-        
-        # Check if action type is applicable to task type
-        if action_type in applicability:
-            return task_type in applicability[action_type]
+        allowed = self._APPLICABILITY.get(action.type.value)
         
         # Default to applicable if not specified
-        return True
+        return True if allowed is None else task.type in allowed
     
-    def _apply_rule(self, rule: Rule, task: Task) -> Dict[str, Any]:
+    def _apply_rule(self, rule: Rule, task: Task) -> Modification:
         """Apply a rule to a task and return the modification.
         
         Args:
@@ -224,46 +434,25 @@ class RuleApplicator:
             task: Task to apply to
             
         Returns:
-            Dictionary describing the modification
+            Modification describing the changes
         """
-        modification = {
-            "rule_id": rule.id,
-            "action_type": rule.action.type.value,
-            "description": rule.action.description,
-            "timestamp": datetime.utcnow().isoformat(),
-            "changes": []
-        }
-        
-        # Simulate different types of rule applications
-        action_type = rule.action.type.value
-        
-        if action_type == "naming":
-            # Simulate naming convention application
-            change = self._apply_naming_rule(rule, task)
-            if change:
-                modification["changes"].append(change)
-        
-        elif action_type == "style":
-            # Simulate style rule application
-            change = self._apply_style_rule(rule, task)
-            if change:
-                modification["changes"].append(change)
-        
-        elif action_type == "structure":
-            # Simulate structure rule application
-            change = self._apply_structure_rule(rule, task)
-            if change:
-                modification["changes"].append(change)
-        
-        elif action_type == "behavior":
-            # Simulate behavior rule application
-            change = self._apply_behavior_rule(rule, task)
-            if change:
-                modification["changes"].append(change)
+        modification = Modification(
+            rule_id=rule.id,
+            action_type=rule.action.type.value,
+            description=rule.action.description,
+            timestamp=datetime.utcnow(),
+            changes=[]
+        )
+        
+        # Dispatch to the handler for this action type
+        handler_name = self._ACTION_DISPATCH.get(rule.action.type.value)
+        change = getattr(self, handler_name)(rule, task) if handler_name else None
+        if change:
+            modification.changes.append(change)
         
         return modification
     
-    def _apply_naming_rule(self, rule: Rule, task: Task) -> Optional[Dict[str, Any]]:
+    def _apply_naming_rule(self, rule: Rule, task: Task) -> Optional[Change]:
         """Apply a naming convention rule.
         
         Args:
@@ -285,27 +474,24 @@ class RuleApplicator:
         if not convention:
             return None
         
+        # Check task context for variables that need naming
+        variables = task.context.get("variables_needed") if task.context else None
+        if not variables:
+            return None
+        
         # Simulate applying the convention
-        change = {
-            "type": "naming_convention",
-            "convention": convention,
-            "affected_items": []
-        }
+        affected_items = [
+            {"original": var, "converted": converted}
+            for var in variables
+            if isinstance(var, str) and (converted := _convert_name(var, convention)) != var
+        ]
         
-        # Check task context for variables that need naming
-        if task.context and "variables_needed" in task.context:
-            for var in task.context["variables_needed"]:
-                if isinstance(var, str):
-                    converted = self._convert_to_convention(var, convention)
-                    if converted != var:
-                        change["affected_items"].append({
-                            "original": var,
-                            "converted": converted
-                        })
-        
-        return change if change["affected_items"] else None
+        if not affected_items:
+            return None
+        
+        return Change(type="naming_convention", items=affected_items, convention=convention)
     
-    def _apply_style_rule(self, rule: Rule, task: Task) -> Optional[Dict[str, Any]]:
+    def _apply_style_rule(self, rule: Rule, task: Task) -> Optional[Change]:
         """Apply a style rule.
         
         Args:
@@ -316,17 +502,14 @@ class RuleApplicator:
             Change description or None
         """
         # Extract style parameters
-        change = {
-            "type": "style",
-            "style_rules": []
-        }
+        style_rules = []
         
         # Check for indentation rules
         indent_match = re.search(r'(\d+)\s*(spaces?|tabs?)', rule.action.description.lower())
         if indent_match:
             amount = indent_match.group(1)
             unit = indent_match.group(2)
-            change["style_rules"].append({
+            style_rules.append({
                 "rule": "indentation",
                 "value": f"{amount} {unit}"
             })
@@ -335,14 +518,14 @@ class RuleApplicator:
         length_match = re.search(r'(\d+)\s*characters?', rule.action.description.lower())
         if length_match:
             length = length_match.group(1)
-            change["style_rules"].append({
+            style_rules.append({
                 "rule": "line_length",
                 "value": f"{length} characters"
             })
         
-        return change if change["style_rules"] else None
+        return Change(type="style", items=style_rules, convention=None) if style_rules else None
     
-    def _apply_structure_rule(self, rule: Rule, task: Task) -> Optional[Dict[str, Any]]:
+    def _apply_structure_rule(self, rule: Rule, task: Task) -> Optional[Change]:
         """Apply a structure rule.
         
         Args:
@@ -352,33 +535,18 @@ class RuleApplicator:
         Returns:
             Change description or None
         """
-        change = {
-            "type": "structure",
-            "organization": []
-        }
-        
         # Extract organization patterns
-        if "separate" in rule.action.description.lower():
-            change["organization"].append({
-                "pattern": "separation",
-                "description": "Separate components into individual files"
-            })
-        
-        if "group" in rule.action.description.lower():
-            change["organization"].append({
-                "pattern": "grouping",
-                "description": "Group related items together"
-            })
-        
-        if "organize" in rule.action.description.lower():
-            change["organization"].append({
-                "pattern": "organization",
-                "description": rule.action.description
-            })
-        
-        return change if change["organization"] else None
+        description = rule.action.description
+        description_lower = description.lower()
+        organization = [
+            {"pattern": pattern, "description": summary or description}
+            for keyword, pattern, summary in self._STRUCTURE_KEYWORDS
+            if keyword in description_lower
+        ]
+        
+        return Change(type="structure", items=organization, convention=None) if organization else None
     
-    def _apply_behavior_rule(self, rule: Rule, task: Task) -> Optional[Dict[str, Any]]:
+    def _apply_behavior_rule(self, rule: Rule, task: Task) -> Optional[Change]:
         """Apply a behavior rule.
         
         Args:
@@ -388,39 +556,15 @@ class RuleApplicator:
         Returns:
             Change description or None
         """
-        change = {
-            "type": "behavior",
-            "behaviors": []
-        }
-        
         # Extract behavioral patterns
         description_lower = rule.action.description.lower()
+        behaviors = [
+            {"action": action, "description": summary}
+            for keyword, action, summary in self._BEHAVIOR_KEYWORDS
+            if keyword in description_lower
+        ]
         
-        if "validate" in description_lower:
-            change["behaviors"].append({
-                "action": "validation",
-                "description": "Add input validation"
-            })
-        
-        if "log" in description_lower:
-            change["behaviors"].append({
-                "action": "logging",
-                "description": "Add logging statements"
-            })
-        
-        if "error" in description_lower:
-            change["behaviors"].append({
-                "action": "error_handling",
-                "description": "Add error handling"
-            })
-        
-        if "test" in description_lower:
-            change["behaviors"].append({
-                "action": "testing",
-                "description": "Add test cases"
-            })
-        
-        return change if change["behaviors"] else None
+        return Change(type="behavior", items=behaviors, convention=None) if behaviors else None
     
     def _convert_to_convention(self, name: str, convention: str) -> str:
         """Convert a name to a specific naming convention.
@@ -432,22 +576,7 @@ class RuleApplicator:
         Returns:
             Converted name
         """
-        # Split name into words
-        words = re.findall(r'[A-Z]?[a-z]+|[A-Z]+(?=[A-Z][a-z]|\b)', name)
-        if not words:
-            words = name.split('_')
-        
-        # Convert based on convention
-        if convention == "camelCase":
-            return words[0].lower() + ''.join(w.capitalize() for w in words[1:])
-        elif convention == "snake_case":
-            return '_'.join(w.lower() for w in words)
-        elif convention == "PascalCase":
-            return ''.join(w.capitalize() for w in words)
-        elif convention == "kebab-case":
-            return '-'.join(w.lower() for w in words)
-        
-        return name
+        return _convert_name(name, convention)
     
     def batch_apply(self, task_rules_map: Dict[str, List[Rule]]) -> Dict[str, ApplicationResult]:
         """Apply rules to multiple tasks.
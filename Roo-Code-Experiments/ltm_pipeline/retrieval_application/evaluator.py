@@ -1,57 +1,137 @@
 """Evaluation module for retrieval and application performance."""
 
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, FrozenSet, NamedTuple
+from collections import Counter
+import io
 import time
 from datetime import datetime
+import numpy as np
 
 from ..common.models import Rule, Task, ApplicationResult
 from ..common.metrics import MetricsCollector
 from ..common.logger import get_logger
 
 
+class _ResultIds(NamedTuple):
+    """Rule IDs of one batch result, built once per evaluation call."""
+    retrieved_ids: List[str]                # Retrieved rule IDs, in retrieval order
+    retrieved: FrozenSet[str]               # Retrieved rule IDs
+    expected_retrievals: FrozenSet[str]     # Rule IDs expected to be retrieved
+    applied: FrozenSet[str]                 # Applied rule IDs
+    expected_applications: FrozenSet[str]   # Rule IDs expected to be applied
+    
+    @classmethod
+    def of(cls, result: Dict[str, Any]) -> '_ResultIds':
+        """Build the rule IDs of a batch result dictionary."""
+        ground_truth = result["ground_truth"]
+        retrieved_ids = [rule.id for rule in result["retrieved_rules"]]
+        return cls(
+            retrieved_ids=retrieved_ids,
+            retrieved=frozenset(retrieved_ids),
+            expected_retrievals=frozenset(ground_truth.get("expected_retrievals", [])),
+            applied=frozenset(result["application_result"].applied_rules),
+            expected_applications=frozenset(ground_truth.get("expected_applications", []))
+        )
+
+
+# _ResultIds fields holding ID sets, in the order the batch kernel encodes them
+_RESULT_ID_SETS = ("retrieved", "expected_retrievals", "applied", "expected_applications")
+
+
 class RetrievalEvaluator:
     """Evaluate retrieval and application performance."""
     
+    # Batch series name -> (section, key) of the value in per-task metrics, in output order
+    _SERIES_FIELDS: Dict[str, Tuple[str, str]] = {
+        "retrieval_precision": ("retrieval", "precision"),
+        "retrieval_recall": ("retrieval", "recall"),
+        "retrieval_tp": ("retrieval", "true_positives"),
+        "retrieval_fp": ("retrieval", "false_positives"),
+        "retrieval_fn": ("retrieval", "false_negatives"),
+        "retrieval_f1": ("retrieval", "f1_score"),
+        "total_retrieved": ("retrieval", "total_retrieved"),
+        "total_expected": ("retrieval", "total_expected"),
+        "over_retrieval_rate": ("retrieval", "over_retrieval_rate"),
+        "evaluation_time": ("retrieval", "evaluation_time"),
+        "application_precision": ("application", "precision"),
+        "application_recall": ("application", "recall"),
+        "application_f1": ("application", "f1_score"),
+        "application_correct": ("application", "correct_applications"),
+        "application_incorrect": ("application", "incorrect_applications"),
+        "application_missed": ("application", "missed_applications"),
+        "total_applied": ("application", "total_applied"),
+        "total_skipped": ("application", "total_skipped"),
+        "total_errors": ("application", "total_errors"),
+        "over_application_rate": ("application", "over_application_rate"),
+        "total_rules_processed": ("end_to_end", "total_rules_processed"),
+        "total_rules_applied": ("end_to_end", "total_rules_applied"),
+        "application_rate": ("end_to_end", "application_rate"),
+        "error_rate": ("end_to_end", "error_rate"),
+        "effectiveness": ("end_to_end", "effectiveness")
+    }
+    
     def __init__(self):
         """Initialize the evaluator."""
         self.logger = get_logger("RetrievalEvaluator")
         self.metrics = MetricsCollector("retrieval_evaluation")
+        
+        # Per-evaluation timing ("evaluation_time") is off unless requested
+        self._record_timing = False
+    
+    @property
+    def record_timing(self) -> bool:
+        """Whether evaluations are timed.
+        
+        Retrieval metrics from evaluate_retrieval then include an
+        "evaluation_time" entry. evaluate_batch reports the time of the whole
+        batch under "statistics"; tasks evaluated together are not timed
+        individually, so their per-task metrics have no such entry.
+        """
+        return self._record_timing
+    
+    @record_timing.setter
+    def record_timing(self, enabled: bool) -> None:
+        self._record_timing = enabled
     
     def evaluate_retrieval(self, 
                           retrieved_rules: List[Rule],
                           expected_rules: List[str],
-                          all_relevant_rules: Optional[List[str]] = None) -> Dict[str, float]:
+                          all_relevant_rules: Optional[List[str]] = None,
+                          *,
+                          retrieved_ids: Optional[List[str]] = None,
+                          retrieved_set: Optional[FrozenSet[str]] = None,
+                          expected_set: Optional[FrozenSet[str]] = None) -> Dict[str, float]:
         """Evaluate retrieval performance.
         
         Args:
             retrieved_rules: List of retrieved rules
             expected_rules: List of expected rule IDs
             all_relevant_rules: Optional list of all relevant rule IDs (for recall calculation)
+            retrieved_ids: Optional precomputed IDs of the retrieved rules, in order
+            retrieved_set: Optional precomputed set of retrieved rule IDs
+            expected_set: Optional precomputed set of expected rule IDs
             
         Returns:
             Dictionary containing retrieval metrics
         """
-        start_time = time.time()
+        if self._record_timing:
+            start_ns = time.perf_counter_ns()
         
         # Get retrieved rule IDs
-        retrieved_ids = [rule.id for rule in retrieved_rules]
-        
-        # Calculate true positives, false positives, false negatives
-        retrieved_set = set(retrieved_ids)
-        expected_set = set(expected_rules)
-        
-        true_positives = len(retrieved_set & expected_set)
-        false_positives = len(retrieved_set - expected_set)
-        false_negatives = len(expected_set - retrieved_set)
+        if retrieved_ids is None:
+            retrieved_ids = [rule.id for rule in retrieved_rules]
         
         # Calculate metrics
         metrics = self.metrics.calculate_retrieval_metrics(
             retrieved=retrieved_ids,
             relevant=expected_rules,
-            total_available=len(all_relevant_rules) if all_relevant_rules else len(expected_rules)
+            total_available=len(all_relevant_rules) if all_relevant_rules else len(expected_rules),
+            retrieved_set=retrieved_set,
+            relevant_set=expected_set
         )
         
         # Add additional metrics
+        metrics["f1_score"] = self._f1_scalar(metrics["precision"], metrics["recall"])
         metrics["total_retrieved"] = len(retrieved_rules)
         metrics["total_expected"] = len(expected_rules)
         
@@ -62,8 +142,8 @@ class RetrievalEvaluator:
         else:
             metrics["over_retrieval_rate"] = 0.0
         
-        processing_time = time.time() - start_time
-        metrics["evaluation_time"] = processing_time
+        if self._record_timing:
+            metrics["evaluation_time"] = (time.perf_counter_ns() - start_ns) / 1e9
         
         self.logger.info(f"Retrieval evaluation: Precision={metrics['precision']:.3f}, "
                         f"Recall={metrics['recall']:.3f}, Retrieved={len(retrieved_rules)}, "
@@ -74,29 +154,35 @@ class RetrievalEvaluator:
     def evaluate_application(self,
                            application_result: ApplicationResult,
                            expected_applications: List[str],
-                           task: Optional[Task] = None) -> Dict[str, float]:
+                           task: Optional[Task] = None,
+                           *,
+                           applied_set: Optional[FrozenSet[str]] = None,
+                           expected_set: Optional[FrozenSet[str]] = None) -> Dict[str, float]:
         """Evaluate application performance.
         
         Args:
             application_result: Result of rule application
             expected_applications: List of expected rule IDs to be applied
             task: Optional task for context
+            applied_set: Optional precomputed set of applied rule IDs
+            expected_set: Optional precomputed set of expected rule IDs
             
         Returns:
             Dictionary containing application metrics
         """
         # Calculate application accuracy
-        applied_set = set(application_result.applied_rules)
-        expected_set = set(expected_applications)
+        if applied_set is None:
+            applied_set = set(application_result.applied_rules)
+        if expected_set is None:
+            expected_set = set(expected_applications)
         
         correct_applications = len(applied_set & expected_set)
         incorrect_applications = len(applied_set - expected_set)
         missed_applications = len(expected_set - applied_set)
         
         # Calculate metrics
-        precision = correct_applications / len(applied_set) if applied_set else 0.0
-        recall = correct_applications / len(expected_set) if expected_set else 0.0
-        f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
+        precision, recall, f1 = self._prf1_scalar(correct_applications, incorrect_applications,
+                                                  missed_applications)
         
         # Calculate over-application rate
         total_rules = len(application_result.applied_rules) + len(application_result.skipped_rules)
@@ -130,7 +216,9 @@ class RetrievalEvaluator:
                            task: Task,
                            retrieved_rules: List[Rule],
                            application_result: ApplicationResult,
-                           ground_truth: Dict[str, Any]) -> Dict[str, Any]:
+                           ground_truth: Dict[str, Any],
+                           *,
+                           result_ids: Optional[_ResultIds] = None) -> Dict[str, Any]:
         """Evaluate end-to-end retrieval and application performance.
         
         Args:
@@ -140,6 +228,7 @@ class RetrievalEvaluator:
             ground_truth: Ground truth containing:
                          - expected_retrievals: List of rule IDs expected to be retrieved
                          - expected_applications: List of rule IDs expected to be applied
+            result_ids: Optional precomputed rule IDs of this result
                          
         Returns:
             Comprehensive evaluation metrics
@@ -150,14 +239,19 @@ class RetrievalEvaluator:
         retrieval_metrics = self.evaluate_retrieval(
             retrieved_rules,
             ground_truth.get("expected_retrievals", []),
-            ground_truth.get("all_relevant_rules")
+            ground_truth.get("all_relevant_rules"),
+            retrieved_ids=result_ids.retrieved_ids if result_ids else None,
+            retrieved_set=result_ids.retrieved if result_ids else None,
+            expected_set=result_ids.expected_retrievals if result_ids else None
         )
         
         # Evaluate application
         application_metrics = self.evaluate_application(
             application_result,
             ground_truth.get("expected_applications", []),
-            task
+            task,
+            applied_set=result_ids.applied if result_ids else None,
+            expected_set=result_ids.expected_applications if result_ids else None
         )
         
         # Calculate combined metrics
@@ -178,18 +272,15 @@ class RetrievalEvaluator:
         
         # Calculate overall effectiveness
         # Effectiveness = (retrieval_f1 + application_f1) / 2
-        retrieval_f1 = (2 * retrieval_metrics["precision"] * retrieval_metrics["recall"]) / \
-                      (retrieval_metrics["precision"] + retrieval_metrics["recall"]) \
-                      if (retrieval_metrics["precision"] + retrieval_metrics["recall"]) > 0 else 0.0
-        
-        application_f1 = application_metrics["f1_score"]
-        
-        combined_metrics["end_to_end"]["effectiveness"] = (retrieval_f1 + application_f1) / 2
+        combined_metrics["end_to_end"]["effectiveness"] = (
+            retrieval_metrics["f1_score"] + application_metrics["f1_score"]
+        ) / 2
         
         return combined_metrics
     
     def evaluate_batch(self,
-                      batch_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+                      batch_results: List[Dict[str, Any]],
+                      keep_individual: bool = True) -> Dict[str, Any]:
         """Evaluate a batch of retrieval and application results.
         
         Args:
@@ -198,102 +289,313 @@ class RetrievalEvaluator:
                           - retrieved_rules: List of retrieved rules
                           - application_result: ApplicationResult
                           - ground_truth: Ground truth data
+            keep_individual: Whether to build per-task metrics for "individual_results"
+                          (left empty otherwise)
                           
         Returns:
             Aggregated evaluation metrics
         """
         self.logger.info(f"Evaluating batch of {len(batch_results)} results")
-        
-        all_metrics = []
+        if self._record_timing:
+            start_ns = time.perf_counter_ns()
+        
+        # Single results are not worth encoding into matrices. The batch path
+        # stays in-process: the vectorized kernel is cheaper than pickling each
+        # result's rules, task and application result out to worker processes.
+        if len(batch_results) > 1:
+            series = self._batch_series(batch_results)
+            all_metrics = self._individual_results(batch_results, series) if keep_individual else []
+        else:
+            all_metrics = [
+                self.evaluate_end_to_end(
+                    result["task"],
+                    result["retrieved_rules"],
+                    result["application_result"],
+                    result["ground_truth"],
+                    result_ids=_ResultIds.of(result)
+                )
+                for result in batch_results
+            ]
+            series = {
+                name: np.array([metrics[section][key] for metrics in all_metrics])
+                for name, (section, key) in self._SERIES_FIELDS.items()
+                if not all_metrics or key in all_metrics[0][section]
+            }
         
         # Aggregate metrics
-        total_retrieval_tp = 0
-        total_retrieval_fp = 0
-        total_retrieval_fn = 0
+        total_retrieval_tp = int(series["retrieval_tp"].sum())
+        total_retrieval_fp = int(series["retrieval_fp"].sum())
+        total_retrieval_fn = int(series["retrieval_fn"].sum())
         
-        total_application_correct = 0
-        total_application_incorrect = 0
-        total_application_missed = 0
-        
-        for result in batch_results:
-            # Evaluate individual result
-            metrics = self.evaluate_end_to_end(
-                result["task"],
-                result["retrieved_rules"],
-                result["application_result"],
-                result["ground_truth"]
-            )
-            all_metrics.append(metrics)
-            
-            # Accumulate retrieval metrics
-            ret_metrics = metrics["retrieval"]
-            total_retrieval_tp += ret_metrics["true_positives"]
-            total_retrieval_fp += ret_metrics["false_positives"]
-            total_retrieval_fn += ret_metrics["false_negatives"]
-            
-            # Accumulate application metrics
-            app_metrics = metrics["application"]
-            total_application_correct += app_metrics["correct_applications"]
-            total_application_incorrect += app_metrics["incorrect_applications"]
-            total_application_missed += app_metrics["missed_applications"]
+        total_application_correct = int(series["application_correct"].sum())
+        total_application_incorrect = int(series["application_incorrect"].sum())
+        total_application_missed = int(series["application_missed"].sum())
         
         # Calculate overall metrics
-        overall_retrieval_precision = total_retrieval_tp / (total_retrieval_tp + total_retrieval_fp) \
-                                    if (total_retrieval_tp + total_retrieval_fp) > 0 else 0.0
-        overall_retrieval_recall = total_retrieval_tp / (total_retrieval_tp + total_retrieval_fn) \
-                                 if (total_retrieval_tp + total_retrieval_fn) > 0 else 0.0
-        
-        overall_application_precision = total_application_correct / \
-                                      (total_application_correct + total_application_incorrect) \
-                                      if (total_application_correct + total_application_incorrect) > 0 else 0.0
-        overall_application_recall = total_application_correct / \
-                                   (total_application_correct + total_application_missed) \
-                                   if (total_application_correct + total_application_missed) > 0 else 0.0
+        overall_retrieval_precision, overall_retrieval_recall, overall_retrieval_f1 = self._prf1_scalar(
+            total_retrieval_tp, total_retrieval_fp, total_retrieval_fn
+        )
+        overall_application_precision, overall_application_recall, overall_application_f1 = self._prf1_scalar(
+            total_application_correct, total_application_incorrect, total_application_missed
+        )
         
         # Calculate statistics
-        effectiveness_values = [m["end_to_end"]["effectiveness"] for m in all_metrics]
-        over_retrieval_values = [m["retrieval"]["over_retrieval_rate"] for m in all_metrics]
-        over_application_values = [m["application"]["over_application_rate"] for m in all_metrics]
+        effectiveness = series["effectiveness"]
+        if effectiveness.size:
+            statistics = {
+                "avg_effectiveness": float(effectiveness.mean()),
+                "avg_over_retrieval_rate": float(series["over_retrieval_rate"].mean()),
+                "avg_over_application_rate": float(series["over_application_rate"].mean()),
+                "min_effectiveness": float(effectiveness.min()),
+                "max_effectiveness": float(effectiveness.max())
+            }
+        else:
+            statistics = dict.fromkeys(("avg_effectiveness", "avg_over_retrieval_rate", "avg_over_application_rate",
+                                        "min_effectiveness", "max_effectiveness"), 0.0)
         
         batch_metrics = {
             "overall": {
                 "retrieval": {
                     "precision": overall_retrieval_precision,
                     "recall": overall_retrieval_recall,
-                    "f1_score": 2 * (overall_retrieval_precision * overall_retrieval_recall) / 
-                               (overall_retrieval_precision + overall_retrieval_recall)
-                               if (overall_retrieval_precision + overall_retrieval_recall) > 0 else 0.0
+                    "f1_score": overall_retrieval_f1
                 },
                 "application": {
                     "precision": overall_application_precision,
                     "recall": overall_application_recall,
-                    "f1_score": 2 * (overall_application_precision * overall_application_recall) / 
-                               (overall_application_precision + overall_application_recall)
-                               if (overall_application_precision + overall_application_recall) > 0 else 0.0
+                    "f1_score": overall_application_f1
                 }
             },
             "statistics": {
                 "num_tasks": len(batch_results),
-                "avg_effectiveness": sum(effectiveness_values) / len(effectiveness_values) 
-                                   if effectiveness_values else 0.0,
-                "avg_over_retrieval_rate": sum(over_retrieval_values) / len(over_retrieval_values)
-                                          if over_retrieval_values else 0.0,
-                "avg_over_application_rate": sum(over_application_values) / len(over_application_values)
-                                            if over_application_values else 0.0,
-                "min_effectiveness": min(effectiveness_values) if effectiveness_values else 0.0,
-                "max_effectiveness": max(effectiveness_values) if effectiveness_values else 0.0
+                **statistics
             },
-            "individual_results": all_metrics
+            "individual_results": all_metrics if keep_individual else []
         }
+        if self._record_timing:
+            batch_metrics["statistics"]["evaluation_time"] = (time.perf_counter_ns() - start_ns) / 1e9
         
         return batch_metrics
     
+    def _batch_series(self, batch_results: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Compute every per-task metric for a whole batch at once.
+        
+        Rule IDs are encoded to integers once, and each task's retrieved,
+        expected, applied and expected-applied IDs are flattened into
+        (task, rule) keys. Per-task true positives are counted with one
+        membership test over the keys and a bincount by task. Produces the
+        same values as calling evaluate_end_to_end per result.
+        
+        Args:
+            batch_results: Batch results, as for evaluate_batch
+            
+        Returns:
+            Series name (see _SERIES_FIELDS) -> array with one value per task
+        """
+        num_tasks = len(batch_results)
+        
+        result_ids = [_ResultIds.of(result) for result in batch_results]
+        
+        # Encode rule IDs to column indices
+        rule_index: Dict[str, int] = {}
+        for ids in result_ids:
+            for name in _RESULT_ID_SETS:
+                for rule_id in getattr(ids, name):
+                    if rule_id not in rule_index:
+                        rule_index[rule_id] = len(rule_index)
+        
+        retrieved, expected_retrieved, applied, expected_applied = (
+            self._encode_id_sets([getattr(ids, name) for ids in result_ids], rule_index) for name in _RESULT_ID_SETS
+        )
+        
+        # Confusion counts for every task
+        retrieval_tp, retrieval_fp, retrieval_fn = self._confusion_counts(retrieved, expected_retrieved, num_tasks)
+        application_tp, application_fp, application_fn = self._confusion_counts(applied, expected_applied,
+                                                                                num_tasks)
+        
+        # List lengths (duplicates included, as in the per-task path)
+        num_retrieved = np.array([len(ids.retrieved_ids) for ids in result_ids])
+        num_expected = np.array([len(r["ground_truth"].get("expected_retrievals", [])) for r in batch_results])
+        num_applied = np.array([len(r["application_result"].applied_rules) for r in batch_results])
+        num_skipped = np.array([len(r["application_result"].skipped_rules) for r in batch_results])
+        num_errors = np.array([len(r["application_result"].errors) for r in batch_results])
+        num_processed = num_applied + num_skipped
+        
+        retrieval_precision = self._safe_divide(retrieval_tp, num_retrieved)
+        retrieval_recall = self._safe_divide(retrieval_tp, num_expected)
+        retrieval_f1 = self._f1_vec(retrieval_precision, retrieval_recall)
+        
+        application_precision, application_recall, application_f1 = self._prf1_vec(
+            application_tp, application_fp, application_fn
+        )
+        over_application_rate = self._safe_divide(application_fp, num_processed)
+        
+        series = {
+            "retrieval_precision": retrieval_precision,
+            "retrieval_recall": retrieval_recall,
+            "retrieval_tp": retrieval_tp,
+            "retrieval_fp": retrieval_fp,
+            "retrieval_fn": retrieval_fn,
+            "retrieval_f1": retrieval_f1,
+            "total_retrieved": num_retrieved,
+            "total_expected": num_expected,
+            "over_retrieval_rate": self._safe_divide(np.maximum(0, num_retrieved - num_expected), num_expected),
+            "application_precision": application_precision,
+            "application_recall": application_recall,
+            "application_f1": application_f1,
+            "application_correct": application_tp,
+            "application_incorrect": application_fp,
+            "application_missed": application_fn,
+            "total_applied": num_applied,
+            "total_skipped": num_skipped,
+            "total_errors": num_errors,
+            "over_application_rate": over_application_rate,
+            "total_rules_processed": num_retrieved,
+            "total_rules_applied": num_applied,
+            "application_rate": self._safe_divide(num_applied, num_retrieved),
+            "error_rate": self._safe_divide(num_errors, num_processed),
+            "effectiveness": (retrieval_f1 + application_f1) / 2
+        }
+        # Record the same metrics the per-task path records
+        for row in zip(retrieval_precision.tolist(), num_retrieved.tolist(), num_expected.tolist(),
+                       retrieval_recall.tolist(), retrieval_tp.tolist(), retrieval_fn.tolist(),
+                       application_precision.tolist(), application_recall.tolist(),
+                       application_f1.tolist(), over_application_rate.tolist()):
+            (ret_precision, total_retrieved, total_expected, ret_recall, ret_tp, ret_fn,
+             app_precision, app_recall, app_f1, app_over_rate) = row
+            self.metrics.record("retrieval_precision", ret_precision,
+                                retrieved_count=total_retrieved,
+                                relevant_count=total_expected)
+            self.metrics.record("retrieval_recall", ret_recall,
+                                true_positives=ret_tp,
+                                false_negatives=ret_fn)
+            self.metrics.record("application_precision", app_precision)
+            self.metrics.record("application_recall", app_recall)
+            self.metrics.record("application_f1", app_f1)
+            self.metrics.record("over_application_rate", app_over_rate)
+        
+        return series
+    
+    def _individual_results(self, batch_results: List[Dict[str, Any]],
+                            series: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Build per-task metrics in evaluate_end_to_end's format from batch series.
+        
+        Args:
+            batch_results: Batch results the series were computed from
+            series: Per-task metric series from _batch_series
+            
+        Returns:
+            List of per-task metrics
+        """
+        names = [name for name in self._SERIES_FIELDS if name in series]
+        fields = [self._SERIES_FIELDS[name] for name in names]
+        columns = [series[name].tolist() for name in names]
+        
+        all_metrics = []
+        for result, row in zip(batch_results, zip(*columns)):
+            metrics = {"task_id": result["task"].id, "retrieval": {}, "application": {}, "end_to_end": {}}
+            for (section, key), value in zip(fields, row):
+                metrics[section][key] = value
+            all_metrics.append(metrics)
+        
+        return all_metrics
+    
+    def _encode_id_sets(self, id_sets: List[FrozenSet[str]],
+                        rule_index: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flatten per-task rule ID sets into (task, rule) keys, CSR style.
+        
+        Args:
+            id_sets: Rule ID set for each task
+            rule_index: Rule ID -> integer code
+            
+        Returns:
+            Tuple of (set size per task, task index per key, key per (task, rule) pair)
+        """
+        sizes = np.fromiter((len(ids) for ids in id_sets), dtype=np.int64, count=len(id_sets))
+        rows = np.repeat(np.arange(len(id_sets), dtype=np.int64), sizes)
+        codes = np.fromiter((rule_index[rule_id] for ids in id_sets for rule_id in ids),
+                            dtype=np.int64, count=int(sizes.sum()))
+        return sizes, rows, rows * len(rule_index) + codes
+    
+    @staticmethod
+    def _confusion_counts(predicted: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                          expected: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                          num_tasks: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Count per-task true positives, false positives and false negatives.
+        
+        Args:
+            predicted: Encoded predicted ID sets, from _encode_id_sets
+            expected: Encoded expected ID sets, from _encode_id_sets
+            num_tasks: Number of tasks in the batch
+            
+        Returns:
+            Tuple of (tp, fp, fn) arrays with one count per task
+        """
+        predicted_sizes, predicted_rows, predicted_keys = predicted
+        expected_sizes, _, expected_keys = expected
+        # np.isin already runs a sort/merge (or lookup table) over the integer
+        # keys; presorting them before a searchsorted merge measured no faster
+        hits = np.isin(predicted_keys, expected_keys, assume_unique=True)
+        tp = np.bincount(predicted_rows[hits], minlength=num_tasks)
+        return tp, predicted_sizes - tp, expected_sizes - tp
+    
+    @staticmethod
+    def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Divide elementwise, yielding 0.0 where the denominator is not positive."""
+        return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+    
+    @classmethod
+    def _f1_vec(cls, precision: np.ndarray, recall: np.ndarray) -> np.ndarray:
+        """Compute F1 elementwise, yielding 0.0 where precision and recall are both 0."""
+        return cls._safe_divide(2 * (precision * recall), precision + recall)
+    
+    @classmethod
+    def _prf1_vec(cls, tp: np.ndarray, fp: np.ndarray,
+                  fn: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute precision, recall and F1 elementwise from confusion counts.
+        
+        Args:
+            tp: True positive counts
+            fp: False positive counts
+            fn: False negative counts
+            
+        Returns:
+            Tuple of (precision, recall, f1) arrays, 0.0 wherever undefined
+        """
+        precision = cls._safe_divide(tp, tp + fp)
+        recall = cls._safe_divide(tp, tp + fn)
+        return precision, recall, cls._f1_vec(precision, recall)
+    
+    @classmethod
+    def _prf1_scalar(cls, tp: int, fp: int, fn: int) -> Tuple[float, float, float]:
+        """Compute precision, recall and F1 from confusion counts for a single item.
+        
+        Args:
+            tp: True positive count
+            fp: False positive count
+            fn: False negative count
+            
+        Returns:
+            Tuple of (precision, recall, f1), 0.0 wherever undefined
+        """
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+        return precision, recall, cls._f1_scalar(precision, recall)
+    
+    @staticmethod
+    def _f1_scalar(precision: float, recall: float) -> float:
+        """Compute F1 from precision and recall, 0.0 if both are 0."""
+        return 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
+    
     def analyze_failures(self,
-                        batch_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+                        batch_results: List[Dict[str, Any]],
+                        collect_details: bool = True) -> Dict[str, Any]:
         """Analyze failures in retrieval and application.
         
         Args:
             batch_results: Batch results to analyze
+            collect_details: Whether to list each retrieval false positive;
+                           when False only their per-rule counts are kept
             
         Returns:
             Failure analysis
@@ -309,23 +611,28 @@ class RetrievalEvaluator:
             "errors": []
         }
         
+        # Rule ID -> number of times it was retrieved without being expected
+        false_positive_counts: Counter = Counter()
+        
         for result in batch_results:
             task = result["task"]
             retrieved_rules = result["retrieved_rules"]
             app_result = result["application_result"]
-            ground_truth = result["ground_truth"]
+            ids = _ResultIds.of(result)
             
             # Analyze retrieval failures
-            retrieved_ids = [r.id for r in retrieved_rules]
-            expected_retrievals = set(ground_truth.get("expected_retrievals", []))
+            retrieved_ids = ids.retrieved
+            expected_retrievals = ids.expected_retrievals
             
             for rule in retrieved_rules:
                 if rule.id not in expected_retrievals:
-                    retrieval_failures["false_positives"].append({
-                        "task_id": task.id,
-                        "rule_id": rule.id,
-                        "rule_description": rule.action.description
-                    })
+                    false_positive_counts[rule.id] += 1
+                    if collect_details:
+                        retrieval_failures["false_positives"].append({
+                            "task_id": task.id,
+                            "rule_id": rule.id,
+                            "rule_description": rule.action.description
+                        })
             
             for expected_id in expected_retrievals:
                 if expected_id not in retrieved_ids:
@@ -335,7 +642,8 @@ class RetrievalEvaluator:
                     })
             
             # Analyze application failures
-            expected_applications = set(ground_truth.get("expected_applications", []))
+            expected_applications = ids.expected_applications
+            applied_ids = ids.applied
             
             for applied_id in app_result.applied_rules:
                 if applied_id not in expected_applications:
@@ -345,7 +653,7 @@ class RetrievalEvaluator:
                     })
             
             for expected_id in expected_applications:
-                if expected_id not in app_result.applied_rules:
+                if expected_id not in applied_ids:
                     application_failures["missed_applications"].append({
                         "task_id": task.id,
                         "rule_id": expected_id,
@@ -363,33 +671,35 @@ class RetrievalEvaluator:
         analysis = {
             "retrieval_failures": retrieval_failures,
             "application_failures": application_failures,
-            "patterns": self._analyze_failure_patterns(retrieval_failures, application_failures)
+            "patterns": self._analyze_failure_patterns(retrieval_failures, application_failures,
+                                                       false_positive_counts)
         }
         
         return analysis
     
     def _analyze_failure_patterns(self,
                                  retrieval_failures: Dict[str, List],
-                                 application_failures: Dict[str, List]) -> Dict[str, Any]:
+                                 application_failures: Dict[str, List],
+                                 false_positive_counts: Counter) -> Dict[str, Any]:
         """Analyze patterns in failures.
         
         Args:
             retrieval_failures: Retrieval failure data
             application_failures: Application failure data
+            false_positive_counts: Retrieval false positive counts by rule ID
             
         Returns:
             Pattern analysis
         """
+        false_positive_count = sum(false_positive_counts.values())
+        false_negative_count = len(retrieval_failures["false_negatives"])
+        
         patterns = {
             "retrieval": {
-                "false_positive_rate": len(retrieval_failures["false_positives"]) / 
-                                      (len(retrieval_failures["false_positives"]) + 
-                                       len(retrieval_failures["false_negatives"]))
-                                      if (retrieval_failures["false_positives"] or 
-                                          retrieval_failures["false_negatives"]) else 0.0,
-                "common_false_positive_rules": self._get_common_items(
-                    retrieval_failures["false_positives"], "rule_id"
-                )
+                "false_positive_count": false_positive_count,
+                "false_positive_rate": false_positive_count / (false_positive_count + false_negative_count)
+                                      if (false_positive_count or false_negative_count) else 0.0,
+                "common_false_positive_rules": self._get_common_items(false_positive_counts)
             },
             "application": {
                 "missed_but_retrieved": sum(1 for m in application_failures["missed_applications"]
@@ -404,21 +714,17 @@ class RetrievalEvaluator:
         
         return patterns
     
-    def _get_common_items(self, items: List[Dict], key: str, top_n: int = 5) -> List[Tuple[str, int]]:
-        """Get most common items by key.
+    def _get_common_items(self, counts: Counter, top_n: int = 5) -> List[Tuple[str, int]]:
+        """Get the most common items from precomputed counts.
         
         Args:
-            items: List of dictionaries
-            key: Key to count by
+            counts: Item counts
             top_n: Number of top items to return
             
         Returns:
             List of (item, count) tuples
         """
-        from collections import Counter
-        
-        counter = Counter(item.get(key) for item in items if key in item)
-        return counter.most_common(top_n)
+        return counts.most_common(top_n)
     
     def generate_report(self,
                        batch_metrics: Dict[str, Any],
@@ -434,75 +740,62 @@ class RetrievalEvaluator:
         Returns:
             Report as string
         """
-        report_lines = [
-            "=" * 60,
-            "Retrieval & Application Evaluation Report",
-            "=" * 60,
-            "",
-            f"Evaluation Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}",
-            ""
-        ]
+        rule = "=" * 60
+        section_rule = "-" * 30
+        buf = io.StringIO()
+        w = buf.write
+        
+        w(f"{rule}\nRetrieval & Application Evaluation Report\n{rule}\n\n")
+        w(f"Evaluation Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
         
         # Overall performance
         if "overall" in batch_metrics:
-            overall = batch_metrics["overall"]
-            report_lines.extend([
-                "Overall Performance:",
-                "-" * 30,
-                "",
-                "Retrieval Metrics:",
-                f"  Precision: {overall['retrieval']['precision']:.3f}",
-                f"  Recall: {overall['retrieval']['recall']:.3f}",
-                f"  F1 Score: {overall['retrieval']['f1_score']:.3f}",
-                "",
-                "Application Metrics:",
-                f"  Precision: {overall['application']['precision']:.3f}",
-                f"  Recall: {overall['application']['recall']:.3f}",
-                f"  F1 Score: {overall['application']['f1_score']:.3f}",
-                ""
-            ])
+            retrieval = batch_metrics["overall"]["retrieval"]
+            application = batch_metrics["overall"]["application"]
+            w(f"Overall Performance:\n{section_rule}\n\n")
+            w("Retrieval Metrics:\n  Precision: %.3f\n  Recall: %.3f\n  F1 Score: %.3f\n\n"
+              % (retrieval["precision"], retrieval["recall"], retrieval["f1_score"]))
+            w("Application Metrics:\n  Precision: %.3f\n  Recall: %.3f\n  F1 Score: %.3f\n\n"
+              % (application["precision"], application["recall"], application["f1_score"]))
         
         # Statistics
         if "statistics" in batch_metrics:
             stats = batch_metrics["statistics"]
-            report_lines.extend([
-                "Batch Statistics:",
-                "-" * 30,
-                f"Number of Tasks: {stats['num_tasks']}",
-                f"Average Effectiveness: {stats['avg_effectiveness']:.3f}",
-                f"Average Over-retrieval Rate: {stats['avg_over_retrieval_rate']:.3f}",
-                f"Average Over-application Rate: {stats['avg_over_application_rate']:.3f}",
-                f"Effectiveness Range: [{stats['min_effectiveness']:.3f}, {stats['max_effectiveness']:.3f}]",
-                ""
-            ])
+            w(f"Batch Statistics:\n{section_rule}\n")
+            w(f"Number of Tasks: {stats['num_tasks']}\n")
+            w("Average Effectiveness: %.3f\n"
+              "Average Over-retrieval Rate: %.3f\n"
+              "Average Over-application Rate: %.3f\n"
+              "Effectiveness Range: [%.3f, %.3f]\n\n"
+              % (stats["avg_effectiveness"], stats["avg_over_retrieval_rate"],
+                 stats["avg_over_application_rate"], stats["min_effectiveness"],
+                 stats["max_effectiveness"]))
         
         # Failure analysis
         if failure_analysis:
-            report_lines.extend([
-                "Failure Analysis:",
-                "-" * 30,
-                f"Retrieval False Positives: {len(failure_analysis['retrieval_failures']['false_positives'])}",
-                f"Retrieval False Negatives: {len(failure_analysis['retrieval_failures']['false_negatives'])}",
-                f"Application Incorrect: {len(failure_analysis['application_failures']['incorrect_applications'])}",
-                f"Application Missed: {len(failure_analysis['application_failures']['missed_applications'])}",
-                f"Application Errors: {len(failure_analysis['application_failures']['errors'])}",
-                ""
-            ])
+            retrieval_failures = failure_analysis["retrieval_failures"]
+            application_failures = failure_analysis["application_failures"]
+            retrieval_patterns = failure_analysis["patterns"]["retrieval"]
+            false_positives = retrieval_patterns.get("false_positive_count",
+                                                     len(retrieval_failures["false_positives"]))
+            w(f"Failure Analysis:\n{section_rule}\n")
+            w(f"Retrieval False Positives: {false_positives}\n")
+            w(f"Retrieval False Negatives: {len(retrieval_failures['false_negatives'])}\n")
+            w(f"Application Incorrect: {len(application_failures['incorrect_applications'])}\n")
+            w(f"Application Missed: {len(application_failures['missed_applications'])}\n")
+            w(f"Application Errors: {len(application_failures['errors'])}\n\n")
             
             # Common failures
-            if failure_analysis["patterns"]["retrieval"]["common_false_positive_rules"]:
-                report_lines.append("Common False Positive Rules:")
-                for rule_id, count in failure_analysis["patterns"]["retrieval"]["common_false_positive_rules"]:
-                    report_lines.append(f"  {rule_id}: {count} occurrences")
-                report_lines.append("")
-        
-        report_lines.extend([
-            "=" * 60,
-            "End of Report",
-            "=" * 60
-        ])
-        
-        report = "\n".join(report_lines)
+            common_rules = retrieval_patterns["common_false_positive_rules"]
+            if common_rules:
+                w("Common False Positive Rules:\n")
+                for rule_id, count in common_rules:
+                    w(f"  {rule_id}: {count} occurrences\n")
+                w("\n")
+        
+        w(f"{rule}\nEnd of Report\n{rule}")
+        
+        report = buf.getvalue()
         
         # Save if path provided
         if output_path:
@@ -2,44 +2,102 @@
 
 from typing import Dict, List, Any, Optional, Set, Tuple
 import json
+import os
+import uuid
 from pathlib import Path
 from datetime import datetime
 import pickle
-from collections import defaultdict
+import heapq
+import bisect
+import atexit
+import queue
+import threading
+from collections import Counter, defaultdict, OrderedDict
+from operator import itemgetter
 
-from ..common.models import Rule
+from ..common.models import Rule, RULE_TUPLE_FIELDS
 from ..common.logger import get_logger
 from ..utils.file_io import FileIO
 
 
+# Shared posting list for index misses
+_EMPTY_POSTINGS: frozenset = frozenset()
+
+# Snapshot layout version: 2 stores rules as RULE_TUPLE_FIELDS-ordered rows
+_SNAPSHOT_FORMAT = 2
+
+# Description words that are never indexed
+_INDEX_STOP_WORDS = frozenset({"the", "and", "for", "with"})
+
+
+def _index_keywords_of(rule: Rule) -> frozenset:
+    """Compute the keyword index keys of a rule (see SimulatedLTMStorage._index_keywords)."""
+    words = set()
+    
+    # Keywords in match criteria, skipping very short words
+    if rule.match_criteria.value:
+        words.update(word for word in rule.match_criteria.value.lower().split() if len(word) > 2)
+    
+    # Keywords in action description
+    words.update(
+        word for word in rule.action.description.lower().split()
+        if len(word) > 3 and word not in _INDEX_STOP_WORDS
+    )
+    
+    return frozenset(words)
+
+
 class SimulatedLTMStorage:
     """Simulated storage system for long-term memory of rules."""
     
     def __init__(self, storage_path: Optional[str] = None, 
                  index_update_frequency: int = 100,
-                 cache_size: int = 1000):
+                 cache_size: int = 1000,
+                 wal_compaction_threshold: int = 500):
         """Initialize the LTM storage.
         
         Args:
             storage_path: Path to persist storage (optional)
             index_update_frequency: How often to update indices
             cache_size: Maximum number of rules to cache in memory
+            wal_compaction_threshold: Rules appended to the write-ahead log before
+                it is compacted into a full snapshot
         """
         self.logger = get_logger("SimulatedLTMStorage")
         self.storage_path = Path(storage_path) if storage_path else None
         self.index_update_frequency = index_update_frequency
         self.cache_size = cache_size
+        self.wal_compaction_threshold = wal_compaction_threshold
+        
+        # Set when a stored rule replaces one with the same ID, leaving stale
+        # index entries behind until the next rebuild
+        self._indices_dirty = False
+        
+        # Number of rules in the write-ahead log since the last snapshot
+        self._wal_entries = 0
+        
+        # Disk writes are handed to a background writer thread, started on first use
+        self._write_queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        
+        # First error hit by the writer thread, re-raised by the next flush()
+        self._write_error: Optional[Exception] = None
         
         # Primary storage
         self.rules: Dict[str, Rule] = {}
         
-        # Indices for efficient retrieval
+        # Indices for efficient retrieval. They are kept as separate tables:
+        # fusing them under namespaced keys ("k:word") makes every lookup
+        # build a new key string, which costs more than the extra table.
         self.keyword_index: Dict[str, Set[str]] = defaultdict(set)  # keyword -> rule_ids
         self.type_index: Dict[str, Set[str]] = defaultdict(set)     # action_type -> rule_ids
         self.pattern_index: Dict[str, Set[str]] = defaultdict(set)   # pattern -> rule_ids
         
-        # Cache for frequently accessed rules
-        self.access_cache: Dict[str, Tuple[Rule, int]] = {}  # rule_id -> (rule, access_count)
+        # Sorted keyword_index keys for prefix search, rebuilt when keys are added
+        self._sorted_keywords: Optional[List[str]] = None
+        
+        # LRU cache of recently accessed rules, least recently used first
+        self.access_cache: "OrderedDict[str, Rule]" = OrderedDict()  # rule_id -> rule
         
         # Statistics
         self.stats = {
@@ -51,7 +109,7 @@ class SimulatedLTMStorage:
         }
         
         # Load existing storage if available
-        if self.storage_path and self.storage_path.exists():
+        if self.storage_path:
             self._load_storage()
         
         self.logger.info(f"Initialized LTM storage with {len(self.rules)} existing rules")
@@ -66,7 +124,13 @@ class SimulatedLTMStorage:
             True if stored successfully
         """
         try:
-            # Store the rule
+            # Store the rule. Re-storing an ID, even with the same object
+            # after it was changed in place, leaves stale index entries
+            # behind; derived values are dropped in case a dictionary field
+            # was changed in place, which Rule.derived cannot detect
+            if rule.id in self.rules:
+                self._indices_dirty = True
+            rule.clear_derived()
             self.rules[rule.id] = rule
             
             # Update indices
@@ -75,13 +139,16 @@ class SimulatedLTMStorage:
             # Update statistics
             self.stats["total_stored"] += 1
             
-            # Check if we need to update indices
-            if self.stats["total_stored"] % self.index_update_frequency == 0:
+            # Indexing is incremental, so a rebuild is only needed to drop
+            # entries left behind by replaced rules
+            if self._indices_dirty and self.stats["total_stored"] % self.index_update_frequency == 0:
                 self._rebuild_indices()
             
-            # Persist if configured
-            if self.storage_path and self.stats["total_stored"] % 10 == 0:
-                self._save_storage()
+            # Persist if configured: append to the log, snapshot once it grows large
+            if self.storage_path:
+                self._append_to_wal(rule)
+                if self._wal_entries >= self.wal_compaction_threshold:
+                    self._save_storage()
             
             self.logger.debug(f"Stored rule {rule.id}")
             return True
@@ -118,13 +185,15 @@ class SimulatedLTMStorage:
             Rule if found, None otherwise
         """
         # Check cache first
-        if rule_id in self.access_cache:
-            rule, count = self.access_cache[rule_id]
-            self.access_cache[rule_id] = (rule, count + 1)
+        rule = self.access_cache.get(rule_id)
+        if rule is not None:
+            self.access_cache.move_to_end(rule_id)
             self.stats["cache_hits"] += 1
             return rule
         
-        # Retrieve from main storage
+        # Retrieve from main storage. All rules are held in memory, so an
+        # absent ID costs one more hash probe; a Bloom filter in front of it
+        # would only pay off once rules can live on disk.
         rule = self.rules.get(rule_id)
         if rule:
             self.stats["cache_misses"] += 1
@@ -150,50 +219,50 @@ class SimulatedLTMStorage:
         """
         self.logger.debug(f"Retrieving rules for context: {list(context.keys())}")
         
-        # Collect candidate rule IDs
-        candidate_ids: Set[str] = set()
+        # Collect the posting lists of every criterion; a rule matching any of
+        # them is a candidate. Misses share one empty set rather than probing
+        # the index twice (or inserting into the defaultdict).
+        keyword_index = self.keyword_index
+        postings: List[Set[str]] = []
         
         # Search by keywords
         if "keywords" in context:
-            for keyword in context["keywords"]:
-                keyword_lower = keyword.lower()
-                if keyword_lower in self.keyword_index:
-                    candidate_ids.update(self.keyword_index[keyword_lower])
+            postings.extend(keyword_index.get(keyword.lower(), _EMPTY_POSTINGS) for keyword in context["keywords"])
         
         # Search by task type
         if "task_type" in context:
-            task_type = context["task_type"]
-            if task_type in self.type_index:
-                candidate_ids.update(self.type_index[task_type])
+            postings.append(self.type_index.get(context["task_type"], _EMPTY_POSTINGS))
         
         # Search by language
         if "language" in context:
-            language_lower = context["language"].lower()
-            if language_lower in self.keyword_index:
-                candidate_ids.update(self.keyword_index[language_lower])
+            postings.append(keyword_index.get(context["language"].lower(), _EMPTY_POSTINGS))
+        
+        candidate_ids: Set[str] = set().union(*postings)
         
         # If no candidates found, try broader search
         if not candidate_ids and "description" in context:
-            description_words = context["description"].lower().split()
-            for word in description_words:
-                if len(word) > 3:  # Skip short words
-                    if word in self.keyword_index:
-                        candidate_ids.update(self.keyword_index[word])
+            candidate_ids = set().union(*(
+                keyword_index.get(word, _EMPTY_POSTINGS)
+                for word in context["description"].lower().split()
+                if len(word) > 3  # Skip short words
+            ))
         
         # Retrieve and score rules
+        query = self._prepare_query(context)
         scored_rules = []
         for rule_id in candidate_ids:
             rule = self.retrieve_rule(rule_id)
             if rule:
-                score = self._calculate_relevance_score(rule, context)
+                score = self._calculate_relevance_score(rule, context, query)
                 scored_rules.append((rule, score))
         
-        # Sort by relevance score
-        scored_rules.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top rules
+        # Return top rules by relevance score; nlargest keeps a bounded heap
+        # and breaks ties in candidate order, like a stable descending sort.
+        # Scores stay floats: quantizing them would turn near-equal scores
+        # into ties and reorder results.
         max_rules = context.get("max_rules", 10)
-        relevant_rules = [rule for rule, score in scored_rules[:max_rules] if score > 0]
+        top_rules = heapq.nlargest(max_rules, (item for item in scored_rules if item[1] > 0), key=itemgetter(1))
+        relevant_rules = [rule for rule, score in top_rules]
         
         self.logger.info(f"Retrieved {len(relevant_rules)} relevant rules from {len(candidate_ids)} candidates")
         return relevant_rules
@@ -205,72 +274,128 @@ class SimulatedLTMStorage:
             rule: Rule to index
         """
         rule_id = rule.id
+        match_criteria = rule.match_criteria
         
         # Index by action type
         self.type_index[rule.action.type.value].add(rule_id)
         
-        # Index by keywords in match criteria
-        if rule.match_criteria.value:
-            words = rule.match_criteria.value.lower().split()
-            for word in words:
-                if len(word) > 2:  # Skip very short words
-                    self.keyword_index[word].add(rule_id)
-        
-        # Index by keywords in action description
-        description_words = rule.action.description.lower().split()
-        for word in description_words:
-            if len(word) > 3 and word not in ["the", "and", "for", "with"]:
-                self.keyword_index[word].add(rule_id)
-        
-        # Index by pattern if applicable
-        if rule.match_criteria.type.value == "pattern":
-            pattern_key = f"pattern:{rule.match_criteria.value[:20]}"  # First 20 chars
+        # Index by keywords in match criteria and action description
+        keyword_index = self.keyword_index
+        for word in self._index_keywords(rule):
+            keyword_index[word].add(rule_id)
+        
+        # Index by pattern if applicable. Pattern values are plain substrings
+        # throughout the pipeline (see RuleApplicator._pattern_matches_task),
+        # not regexes, so there is no pattern set to compile into a scanner.
+        if match_criteria.type.value == "pattern":
+            pattern_key = f"pattern:{match_criteria.value[:20]}"  # First 20 chars
             self.pattern_index[pattern_key].add(rule_id)
     
+    def _index_keywords(self, rule: Rule) -> frozenset:
+        """Get the distinct keyword index keys of a rule.
+        
+        The keys are derived once per rule (see Rule.derived), so rebuilding
+        the indices does not re-tokenize every stored rule.
+        
+        Args:
+            rule: Rule to inspect
+            
+        Returns:
+            Lowercased words from the match value and action description
+        """
+        return rule.derived("index_keywords", _index_keywords_of)
+    
     def _rebuild_indices(self) -> None:
         """Rebuild all indices from scratch."""
         self.logger.info("Rebuilding indices")
         
         # Clear existing indices
         self.keyword_index.clear()
+        self._sorted_keywords = None
         self.type_index.clear()
         self.pattern_index.clear()
         
         # Re-index all rules
         for rule in self.rules.values():
             self._index_rule(rule)
+        self._indices_dirty = False
         
         self.stats["index_updates"] += 1
         self.logger.info(f"Rebuilt indices for {len(self.rules)} rules")
     
-    def _calculate_relevance_score(self, rule: Rule, context: Dict[str, Any]) -> float:
+    def _relevance_fields(self, rule: Rule) -> Tuple[str, str, Optional[str]]:
+        """Get the rule fields relevance scoring reads.
+        
+        Args:
+            rule: Rule to inspect
+            
+        Returns:
+            Tuple of (lowercased "<match value> <action description>", action
+            type value, lowercased context language or None without a context)
+        """
+        match_criteria, action = rule.match_criteria, rule.action
+        text = f"{match_criteria.value} {action.description}".lower()
+        
+        rule_lang = None
+        if match_criteria.context:
+            rule_lang = match_criteria.context.get("language", "")
+            if isinstance(rule_lang, str):
+                rule_lang = rule_lang.lower()
+        
+        return text, action.type.value, rule_lang
+    
+    def _prepare_query(self, context: Dict[str, Any]) -> Tuple[Optional[Tuple[Tuple[str, int], ...]], int, Optional[str]]:
+        """Normalize the parts of a retrieval context used for scoring.
+        
+        Repeated keywords are collapsed into (keyword, count) pairs so each
+        distinct keyword is searched for once per rule.
+        
+        Args:
+            context: Retrieval context
+            
+        Returns:
+            Tuple of (lowercased keyword counts or None, total number of
+            keywords, lowercased language or None)
+        """
+        if "keywords" in context:
+            keyword_counts = tuple(Counter(kw.lower() for kw in context["keywords"]).items())
+            num_keywords = len(context["keywords"])
+        else:
+            keyword_counts, num_keywords = None, 0
+        language = context["language"].lower() if "language" in context else None
+        return keyword_counts, num_keywords, language
+    
+    def _calculate_relevance_score(self, rule: Rule, context: Dict[str, Any],
+                                   query: Optional[Tuple[Optional[Tuple[Tuple[str, int], ...]], int, Optional[str]]] = None) -> float:
         """Calculate relevance score for a rule given a context.
         
         Args:
             rule: Rule to score
             context: Context to match against
+            query: Normalized context from _prepare_query (built if not provided)
             
         Returns:
             Relevance score (0.0 to 1.0)
         """
+        keyword_counts, num_keywords, language = query if query is not None else self._prepare_query(context)
+        rule_text, action_type, rule_lang = self._relevance_fields(rule)
         score = 0.0
         
-        # Check keyword matches
-        if "keywords" in context:
-            rule_text = f"{rule.match_criteria.value} {rule.action.description}".lower()
-            keyword_matches = sum(1 for kw in context["keywords"] if kw.lower() in rule_text)
-            score += min(0.4 * keyword_matches / len(context["keywords"]), 0.4)
+        # Check keyword matches. The keywords are a handful of short strings, so
+        # one C-level substring search per distinct keyword beats building a
+        # multi-pattern automaton (or regex alternation) for every query.
+        if keyword_counts is not None:
+            keyword_matches = sum(count for kw, count in keyword_counts if kw in rule_text)
+            score += min(0.4 * keyword_matches / num_keywords, 0.4)
         
         # Check task type match
         if "task_type" in context:
-            if context["task_type"] == rule.action.type.value:
+            if context["task_type"] == action_type:
                 score += 0.3
         
         # Check language match
-        if "language" in context and rule.match_criteria.context:
-            rule_lang = rule.match_criteria.context.get("language", "").lower()
-            if rule_lang == context["language"].lower():
-                score += 0.2
+        if language is not None and rule_lang == language:
+            score += 0.2
         
         # Boost by rule confidence
         score += 0.1 * rule.confidence
@@ -280,25 +405,28 @@ class SimulatedLTMStorage:
     def _add_to_cache(self, rule_id: str, rule: Rule) -> None:
         """Add a rule to the cache.
         
+        Eviction is LRU, so entries that stop being accessed age out
+        regardless of how often they were hit before; there are no access
+        counts that could pin stale rules in the cache.
+        
         Args:
             rule_id: ID of the rule
             rule: Rule object
         """
         # Check cache size
         if len(self.access_cache) >= self.cache_size:
-            # Evict least accessed rule
-            least_accessed = min(self.access_cache.items(), key=lambda x: x[1][1])
-            del self.access_cache[least_accessed[0]]
+            # Evict least recently used rule
+            self.access_cache.popitem(last=False)
         
         # Add to cache
-        self.access_cache[rule_id] = (rule, 1)
+        self.access_cache[rule_id] = rule
     
     def search_rules(self, query: str, search_type: str = "keyword") -> List[Rule]:
         """Search for rules using various search types.
         
         Args:
             query: Search query
-            search_type: Type of search ("keyword", "pattern", "type")
+            search_type: Type of search ("keyword", "prefix", "pattern", "type")
             
         Returns:
             List of matching rules
@@ -309,6 +437,10 @@ class SimulatedLTMStorage:
             query_lower = query.lower()
             if query_lower in self.keyword_index:
                 matching_ids = self.keyword_index[query_lower]
+        elif search_type == "prefix":
+            matching_ids = set().union(*(
+                self.keyword_index[keyword] for keyword in self._keywords_with_prefix(query.lower())
+            ))
         elif search_type == "pattern":
             pattern_key = f"pattern:{query[:20]}"
             if pattern_key in self.pattern_index:
@@ -326,6 +458,29 @@ class SimulatedLTMStorage:
         
         return rules
     
+    def _keywords_with_prefix(self, prefix: str) -> List[str]:
+        """Find indexed keywords starting with a prefix.
+        
+        Keywords are kept in a sorted list so a prefix is a contiguous range
+        found by binary search rather than a scan of the whole index.
+        
+        Args:
+            prefix: Lowercased prefix
+            
+        Returns:
+            Matching keywords in sorted order
+        """
+        keywords = self._sorted_keywords
+        if keywords is None or len(keywords) != len(self.keyword_index):
+            keywords = self._sorted_keywords = sorted(self.keyword_index)
+        
+        matches = []
+        for i in range(bisect.bisect_left(keywords, prefix), len(keywords)):
+            if not keywords[i].startswith(prefix):
+                break
+            matches.append(keywords[i])
+        return matches
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get storage statistics.
         
@@ -350,12 +505,27 @@ class SimulatedLTMStorage:
         }
     
     def clear(self) -> None:
-        """Clear all stored rules and indices."""
+        """Clear all stored rules and indices, including any persisted files."""
+        self._reset()
+        
+        # Remove the snapshot, indices and log so cleared rules are not
+        # loaded again; queued writes are finished first so none recreate them
+        if self.storage_path:
+            self.flush()
+            for path in (self.storage_path, self.storage_path.with_suffix('.indices'), self._wal_path()):
+                path.unlink(missing_ok=True)
+        
+        self.logger.info("Cleared all storage")
+    
+    def _reset(self) -> None:
+        """Clear all in-memory rules, indices and statistics."""
         self.rules.clear()
         self.keyword_index.clear()
+        self._sorted_keywords = None
         self.type_index.clear()
         self.pattern_index.clear()
         self.access_cache.clear()
+        self._indices_dirty = False
         
         # Reset statistics
         self.stats = {
@@ -365,71 +535,269 @@ class SimulatedLTMStorage:
             "cache_misses": 0,
             "index_updates": 0
         }
+        self._wal_entries = 0
+    
+    def _wal_path(self) -> Path:
+        """Get the path of the write-ahead log next to the snapshot."""
+        return self.storage_path.with_suffix('.wal')
+    
+    def _append_to_wal(self, rule: Rule) -> None:
+        """Append a stored rule to the write-ahead log.
         
-        self.logger.info("Cleared all storage")
+        Args:
+            rule: Rule that was stored
+        """
+        try:
+            line = json.dumps({"id": rule.id, "rule": rule.to_dict()}, ensure_ascii=False, default=str)
+            self._submit_write(("wal", line))
+            self._wal_entries += 1
+        except Exception as e:
+            self.logger.error(f"Failed to append rule {rule.id} to write-ahead log: {e}")
     
     def _save_storage(self) -> None:
-        """Save storage to disk."""
+        """Save a full snapshot to disk and truncate the write-ahead log."""
         if not self.storage_path:
             return
         
         try:
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Prepare data for saving
+            # Prepare data for saving. Both payloads are encoded here, since
+            # the rows share the rules' dicts and callers may edit them before
+            # the writer thread gets to the job
+            snapshot_id = uuid.uuid4().hex
             storage_data = {
-                "rules": {rid: rule.to_dict() for rid, rule in self.rules.items()},
-                "stats": self.stats,
+                "format": _SNAPSHOT_FORMAT,
+                "snapshot_id": snapshot_id,
+                "rule_fields": RULE_TUPLE_FIELDS,
+                "rules": [rule.to_tuple() for rule in self.rules.values()],
+                "stats": dict(self.stats),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            # Save as JSON
-            FileIO.write_json(storage_data, self.storage_path)
-            
-            # Also save indices separately for faster loading
-            indices_path = self.storage_path.with_suffix('.indices')
+            # Also save indices separately for faster loading. Postings hold
+            # each rule's position in the snapshot rather than repeating its ID,
+            # so the indices name the snapshot they were written with.
+            # The dirty flag is not saved, so entries left behind by replaced
+            # rules are dropped now rather than written into the snapshot
+            if self._indices_dirty:
+                self._rebuild_indices()
+            positions = {rule_id: position for position, rule_id in enumerate(self.rules)}
             indices_data = {
-                "keyword_index": {k: list(v) for k, v in self.keyword_index.items()},
-                "type_index": {k: list(v) for k, v in self.type_index.items()},
-                "pattern_index": {k: list(v) for k, v in self.pattern_index.items()}
+                "format": _SNAPSHOT_FORMAT,
+                "snapshot_id": snapshot_id,
+                "keyword_index": {k: sorted(positions[rid] for rid in v) for k, v in self.keyword_index.items()},
+                "type_index": {k: sorted(positions[rid] for rid in v) for k, v in self.type_index.items()},
+                "pattern_index": {k: sorted(positions[rid] for rid in v) for k, v in self.pattern_index.items()}
             }
-            FileIO.write_json(indices_data, indices_path)
             
-            self.logger.debug(f"Saved storage to {self.storage_path}")
+            storage_text = json.dumps(storage_data, ensure_ascii=False, default=str)
+            indices_text = json.dumps(indices_data, ensure_ascii=False, default=str)
+            self._submit_write(("snapshot", storage_text, indices_text))
+            self._wal_entries = 0
             
         except Exception as e:
             self.logger.error(f"Failed to save storage: {e}")
     
+    def flush(self) -> None:
+        """Block until every queued disk write has completed.
+        
+        Raises:
+            Exception: The first error the background writer hit since the
+                last flush, re-raised here so failed writes are not silent
+        """
+        if self._writer is not None:
+            self._write_queue.join()
+        
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def close(self) -> None:
+        """Flush queued disk writes and stop the background writer.
+        
+        The storage can still be used afterwards; the writer is restarted by
+        the next write.
+        
+        Raises:
+            Exception: The first error the background writer hit since the
+                last flush
+        """
+        writer = self._writer
+        if writer is not None:
+            self._writer = None
+            atexit.unregister(self.flush)
+            self._write_queue.put(None)
+            writer.join()
+        self.flush()
+    
+    def _submit_write(self, job: Tuple) -> None:
+        """Queue a disk write for the background writer, starting it if needed.
+        
+        Args:
+            job: ("wal", line) or ("snapshot", storage_text, indices_text),
+                with every payload already encoded as JSON
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="ltm-storage-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._write_queue.put(job)
+    
+    def _writer_loop(self) -> None:
+        """Write queued jobs to disk, coalescing everything queued since the last pass.
+        
+        A None job, queued by close(), stops the loop once the jobs before it
+        are written.
+        """
+        stopping = False
+        while not stopping:
+            jobs = [self._write_queue.get()]
+            while jobs[-1] is not None:
+                try:
+                    jobs.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                if jobs[-1] is None:
+                    stopping = True
+                    if len(jobs) > 1:
+                        self._write_jobs(jobs[:-1])
+                else:
+                    self._write_jobs(jobs)
+            except Exception as e:
+                self.logger.error(f"Failed to write storage: {e}")
+                if self._write_error is None:
+                    self._write_error = e
+            finally:
+                for _ in jobs:
+                    self._write_queue.task_done()
+    
+    def _write_jobs(self, jobs: List[Tuple]) -> None:
+        """Write a batch of queued jobs to disk.
+        
+        Only the last snapshot in the batch is written, since it already holds
+        every rule logged before it; log lines after it go out in one append.
+        
+        Args:
+            jobs: Jobs in submission order
+        """
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        wal_path = self._wal_path()
+        
+        snapshot_positions = [i for i, job in enumerate(jobs) if job[0] == "snapshot"]
+        if snapshot_positions:
+            last = snapshot_positions[-1]
+            _, storage_text, indices_text = jobs[last]
+            
+            # Indices go first: until the snapshot is replaced too, loading
+            # sees they name another snapshot and rebuilds them instead
+            try:
+                self._replace_file(self.storage_path.with_suffix('.indices'), indices_text)
+                self._replace_file(self.storage_path, storage_text)
+            except Exception:
+                # The old snapshot is still in place, so every rule logged in
+                # this batch has to reach the log before the error is reported
+                self._append_wal_lines([job[1] for job in jobs if job[0] == "wal"])
+                raise
+            self._sync_directory()
+            
+            # Everything in the log is now in the snapshot
+            if wal_path.exists():
+                wal_path.unlink()
+            jobs = jobs[last + 1:]
+            self.logger.debug(f"Saved storage to {self.storage_path}")
+        
+        self._append_wal_lines([job[1] for job in jobs])
+    
+    def _append_wal_lines(self, lines: List[str]) -> None:
+        """Append encoded entries to the write-ahead log in one write.
+        
+        Args:
+            lines: JSON-encoded log entries, without newlines
+        """
+        if lines:
+            with open(self._wal_path(), 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines))
+                f.write("\n")
+    
+    def _replace_file(self, path: Path, text: str) -> None:
+        """Atomically replace a file's contents.
+        
+        The text is written and synced to a temporary file next to the
+        target, which is then renamed over it, so a crash leaves either the
+        old or the new file and never a partial one.
+        
+        Args:
+            path: File to replace
+            text: New contents
+        """
+        temp_path = path.with_name(path.name + '.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+    
+    def _sync_directory(self) -> None:
+        """Make renames in the storage directory durable, where the platform supports it."""
+        if os.name != 'posix':
+            return
+        fd = os.open(self.storage_path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
     def _load_storage(self) -> None:
-        """Load storage from disk."""
-        if not self.storage_path or not self.storage_path.exists():
+        """Load storage from disk, replaying any write-ahead log after the snapshot."""
+        if not self.storage_path or not (self.storage_path.exists() or self._wal_path().exists()):
             return
         
         try:
             # Load main storage
-            storage_data = FileIO.read_json(self.storage_path)
+            storage_data = FileIO.read_json(self.storage_path) if self.storage_path.exists() else {}
             
-            # Restore rules
-            for rule_id, rule_dict in storage_data.get("rules", {}).items():
-                rule = Rule.from_dict(rule_dict)
-                self.rules[rule_id] = rule
+            # Restore rules, from rows or from older snapshots keyed by rule ID
+            if storage_data.get("format") == _SNAPSHOT_FORMAT:
+                for row in storage_data["rules"]:
+                    rule = Rule.from_tuple(row)
+                    self.rules[rule.id] = rule
+            else:
+                for rule_id, rule_dict in storage_data.get("rules", {}).items():
+                    rule = Rule.from_dict(rule_dict)
+                    self.rules[rule_id] = rule
             
             # Restore stats
             self.stats.update(storage_data.get("stats", {}))
             
-            # Load indices if available
+            # Load indices if available and written with this snapshot
             indices_path = self.storage_path.with_suffix('.indices')
-            if indices_path.exists():
-                indices_data = FileIO.read_json(indices_path)
-                
-                # Restore indices
+            indices_data = FileIO.read_json(indices_path) if indices_path.exists() else None
+            if indices_data is not None and indices_data.get("snapshot_id") != storage_data.get("snapshot_id"):
+                self.logger.warning(f"Ignoring indices that do not match the snapshot in {self.storage_path}")
+                indices_data = None
+            if indices_data is not None:
+                # Restore indices, mapping snapshot positions back to rule IDs
+                if indices_data.get("format") == _SNAPSHOT_FORMAT:
+                    rule_ids = list(self.rules)
+                    decode = lambda postings: {rule_ids[position] for position in postings}
+                else:
+                    decode = set
                 for k, v in indices_data.get("keyword_index", {}).items():
-                    self.keyword_index[k] = set(v)
+                    self.keyword_index[k] = decode(v)
                 for k, v in indices_data.get("type_index", {}).items():
-                    self.type_index[k] = set(v)
+                    self.type_index[k] = decode(v)
                 for k, v in indices_data.get("pattern_index", {}).items():
-                    self.pattern_index[k] = set(v)
-            else:
+                    self.pattern_index[k] = decode(v)
+            
+            # Replay rules stored after the snapshot
+            self._replay_wal(index_rules=indices_data is not None)
+            
+            if indices_data is None:
                 # Rebuild indices if not available
                 self._rebuild_indices()
             
@@ -437,5 +805,55 @@ class SimulatedLTMStorage:
             
         except Exception as e:
             self.logger.error(f"Failed to load storage: {e}")
-            # Start fresh if loading fails
-            self.clear()
\ No newline at end of file
+            # Start fresh if loading fails, leaving the files on disk as they are
+            self._reset()
+    
+    def _replay_wal(self, index_rules: bool) -> None:
+        """Restore rules stored after the snapshot from the write-ahead log.
+        
+        A crash can leave the last line half-written. Lines that cannot be
+        parsed are skipped, and a torn last line is truncated so the next
+        append starts on a fresh line; the snapshot is kept either way.
+        
+        Args:
+            index_rules: Index replayed rules as they are restored, rather
+                than leaving them to a full rebuild
+        """
+        wal_path = self._wal_path()
+        if not wal_path.exists():
+            return
+        
+        replayed = 0
+        valid_end = 0
+        with open(wal_path, 'rb') as f:
+            for raw_line in f:
+                try:
+                    entry = json.loads(raw_line)
+                    rule_id, rule = entry["id"], Rule.from_dict(entry["rule"])
+                except Exception as e:
+                    # Only a line ending in a newline was written completely
+                    if raw_line.endswith(b"\n"):
+                        valid_end = f.tell()
+                        self.logger.warning(f"Skipping unreadable write-ahead log entry: {e}")
+                    continue
+                valid_end = f.tell()
+                
+                if rule_id in self.rules:
+                    self._indices_dirty = True
+                self.rules[rule_id] = rule
+                self.stats["total_stored"] += 1
+                if index_rules:
+                    self._index_rule(rule)
+                replayed += 1
+            last_line_complete = valid_end == 0 or raw_line.endswith(b"\n")
+        
+        if wal_path.stat().st_size > valid_end:
+            self.logger.warning(f"Truncating torn last line of {wal_path}")
+            with open(wal_path, 'r+b') as f:
+                f.truncate(valid_end)
+        elif not last_line_complete:
+            # The last entry is whole but lost its newline; restore it
+            with open(wal_path, 'ab') as f:
+                f.write(b"\n")
+        
+        self._wal_entries = replayed
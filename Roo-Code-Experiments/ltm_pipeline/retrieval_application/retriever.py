@@ -1,8 +1,9 @@
 """Rule retrieval module for finding relevant rules from LTM storage."""
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
+from functools import lru_cache
 import re
-from datetime import datetime
+import time
 
 from ..common.models import Rule, Task
 from ..common.logger import get_logger
@@ -10,6 +11,54 @@ from ..common.metrics import MetricsCollector
 from .ltm_storage import SimulatedLTMStorage
 
 
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Common words that are never keywords
+_STOP_WORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "shall", "to", "of", "in", "for",
+    "on", "with", "at", "by", "from", "about", "as", "and", "or", "but",
+    "if", "then", "else", "when", "where", "how", "why", "what", "which",
+    "who", "whom", "this", "that", "these", "those", "it", "its"
+})
+
+# Task type -> words in a rule description that make it relevant to that type
+_TASK_TYPE_KEYWORDS = {
+    "code_generation": ("create", "implement", "write", "generate"),
+    "refactoring": ("refactor", "improve", "optimize", "clean"),
+    "debugging": ("fix", "debug", "error", "issue"),
+    "testing": ("test", "verify", "validate", "check")
+}
+
+
+@lru_cache(maxsize=4096)
+def _extract_keywords_cached(text: str) -> Tuple[str, ...]:
+    """Extract up to 10 unique keywords from text, in order of first occurrence."""
+    # Dict keys dedupe while preserving order
+    keywords = dict.fromkeys(
+        word for word in _WORD_RE.findall(text.lower())
+        if len(word) > 2 and word not in _STOP_WORDS
+    )
+    return tuple(keywords)[:10]
+
+
+def _similarity_features_of(rule: Rule) -> Tuple[Any, frozenset, frozenset, str]:
+    """Compute the similarity features of a rule (see RuleRetriever._similarity_features)."""
+    rule_lang = (rule.match_criteria.context or {}).get("language", "")
+    if isinstance(rule_lang, str):
+        rule_lang = rule_lang.lower()
+    
+    rule_text = rule.action.description.lower()
+    task_types = frozenset(
+        task_type for task_type, keywords in _TASK_TYPE_KEYWORDS.items()
+        if any(kw in rule_text for kw in keywords)
+    )
+    rule_keywords = frozenset(_extract_keywords_cached(rule.action.description))
+    
+    return rule_lang, task_types, rule_keywords, (rule.match_criteria.value or "").lower()
+
+
 class RuleRetriever:
     """Retrieve relevant rules from LTM storage based on context."""
     
@@ -36,7 +85,7 @@ class RuleRetriever:
         Returns:
             List of relevant rules
         """
-        start_time = datetime.utcnow()
+        start_ns = time.perf_counter_ns()
         
         # Build retrieval context from task
         context = self._build_context_from_task(task)
@@ -47,16 +96,16 @@ class RuleRetriever:
         # Retrieve from storage
         relevant_rules = self.storage.retrieve_relevant_rules(context)
         
-        # Filter by similarity threshold
+        # Filter by similarity threshold, scoring all candidates in one pass
         filtered_rules = []
-        for rule in relevant_rules:
-            similarity = self._calculate_task_rule_similarity(task, rule)
+        similarities = self._score_rules(task, relevant_rules)
+        for rule, similarity in zip(relevant_rules, similarities):
             if similarity >= self.similarity_threshold:
                 filtered_rules.append(rule)
                 self.logger.debug(f"Rule {rule.id} passed threshold with similarity {similarity:.2f}")
         
         # Record metrics
-        retrieval_time = (datetime.utcnow() - start_time).total_seconds()
+        retrieval_time = (time.perf_counter_ns() - start_ns) / 1e9
         self.metrics.record("retrieval_time", retrieval_time, task_id=task.id)
         self.metrics.record("rules_retrieved", len(filtered_rules), task_id=task.id)
         self.metrics.record("rules_filtered", len(relevant_rules) - len(filtered_rules))
@@ -112,34 +161,8 @@ class RuleRetriever:
         Returns:
             List of keywords
         """
-        # Simple keyword extraction
-        # Remove common words and extract significant terms
-        stop_words = {
-            "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
-            "have", "has", "had", "do", "does", "did", "will", "would", "could",
-            "should", "may", "might", "must", "shall", "to", "of", "in", "for",
-            "on", "with", "at", "by", "from", "about", "as", "and", "or", "but",
-            "if", "then", "else", "when", "where", "how", "why", "what", "which",
-            "who", "whom", "this", "that", "these", "those", "it", "its"
-        }
-        
-        # Tokenize and filter
-        words = re.findall(r'\b\w+\b', text.lower())
-        keywords = []
-        
-        for word in words:
-            if len(word) > 2 and word not in stop_words:
-                keywords.append(word)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_keywords = []
-        for kw in keywords:
-            if kw not in seen:
-                seen.add(kw)
-                unique_keywords.append(kw)
-        
-        return unique_keywords[:10]  # Limit to top 10 keywords
+        # Simple keyword extraction, memoized per text
+        return list(_extract_keywords_cached(text))
     
     def _calculate_task_rule_similarity(self, task: Task, rule: Rule) -> float:
         """Calculate similarity between a task and a rule.
@@ -151,49 +174,69 @@ class RuleRetriever:
         Returns:
             Similarity score (0.0 to 1.0)
         """
-        score = 0.0
+        return self._score_rules(task, [rule])[0]
+    
+    def _score_rules(self, task: Task, rules: List[Rule]) -> List[float]:
+        """Calculate the similarity between a task and each of several rules.
         
-        # Language match
-        if task.language and rule.match_criteria.context:
-            rule_lang = rule.match_criteria.context.get("language", "").lower()
-            if rule_lang == task.language.lower():
-                score += 0.3
-            elif rule_lang == "general" or not rule_lang:
-                score += 0.1
-        
-        # Task type relevance
-        task_type_keywords = {
-            "code_generation": ["create", "implement", "write", "generate"],
-            "refactoring": ["refactor", "improve", "optimize", "clean"],
-            "debugging": ["fix", "debug", "error", "issue"],
-            "testing": ["test", "verify", "validate", "check"]
-        }
+        The task side of the comparison is prepared once for the whole batch
+        and the rule side comes from per-rule cached features.
         
-        if task.type in task_type_keywords:
-            relevant_keywords = task_type_keywords[task.type]
-            rule_text = rule.action.description.lower()
-            if any(kw in rule_text for kw in relevant_keywords):
+        Args:
+            task: Task to compare
+            rules: Rules to compare
+            
+        Returns:
+            Similarity scores (0.0 to 1.0), in the same order as rules
+        """
+        task_keywords = frozenset(_extract_keywords_cached(task.description))
+        task_lang = task.language.lower() if task.language else ""
+        context_str = str(task.context).lower() if task.context else ""
+        
+        scores = []
+        for rule in rules:
+            rule_lang, task_types, rule_keywords, match_value = self._similarity_features(rule)
+            score = 0.0
+            
+            # Language match
+            if task_lang and rule.match_criteria.context:
+                if rule_lang == task_lang:
+                    score += 0.3
+                elif rule_lang == "general" or not rule_lang:
+                    score += 0.1
+            
+            # Task type relevance
+            if task.type in task_types:
                 score += 0.2
+            
+            # Description keyword match
+            if task_keywords and rule_keywords:
+                overlap = len(task_keywords & rule_keywords)
+                if overlap > 0:
+                    score += min(0.3 * overlap / min(len(task_keywords), len(rule_keywords)), 0.3)
+            
+            # Context match
+            if context_str and match_value and match_value in context_str:
+                # Rule match criteria applies to task context
+                score += 0.2
+            
+            scores.append(min(score, 1.0))
         
-        # Description keyword match
-        task_keywords = set(self._extract_keywords(task.description))
-        rule_keywords = set(self._extract_keywords(rule.action.description))
+        return scores
+    
+    def _similarity_features(self, rule: Rule) -> Tuple[Any, frozenset, frozenset, str]:
+        """Get the rule-side inputs to similarity scoring.
         
-        if task_keywords and rule_keywords:
-            overlap = len(task_keywords & rule_keywords)
-            if overlap > 0:
-                score += min(0.3 * overlap / min(len(task_keywords), len(rule_keywords)), 0.3)
+        The features are derived once per rule (see Rule.derived).
         
-        # Context match
-        if task.context and rule.match_criteria.value:
-            # Check if rule match criteria applies to task context
-            match_value = rule.match_criteria.value.lower()
-            context_str = str(task.context).lower()
+        Args:
+            rule: Rule to inspect
             
-            if match_value in context_str:
-                score += 0.2
-        
-        return min(score, 1.0)
+        Returns:
+            Tuple of (lowercased context language, task types the action is
+            relevant to, action keywords, lowercased match value)
+        """
+        return rule.derived("similarity_features", _similarity_features_of)
     
     def batch_retrieve(self, tasks: List[Task], max_rules_per_task: int = 10) -> Dict[str, List[Rule]]:
         """Retrieve rules for multiple tasks.
@@ -207,6 +250,9 @@ class RuleRetriever:
         """
         results = {}
         
+        # Tasks are retrieved sequentially: retrieval is pure-Python work that
+        # threads cannot overlap under the GIL, the storage cache and stats are
+        # not synchronized, and a process pool would pickle the whole storage
         for task in tasks:
             rules = self.retrieve_for_task(task, max_rules_per_task)
             results[task.id] = rules
@@ -248,8 +294,8 @@ class RuleRetriever:
                 })
         
         # Check keyword overlap
-        task_keywords = set(self._extract_keywords(task.description))
-        rule_keywords = set(self._extract_keywords(rule.action.description))
+        task_keywords = set(_extract_keywords_cached(task.description))
+        rule_keywords = set(_extract_keywords_cached(rule.action.description))
         overlap = task_keywords & rule_keywords
         
         if overlap:
@@ -266,8 +312,9 @@ class RuleRetriever:
             })
         
         # Check match criteria
-        if rule.match_criteria.value:
-            if rule.match_criteria.value.lower() in str(task.context).lower():
+        match_value = self._similarity_features(rule)[3]
+        if match_value:
+            if match_value in str(task.context).lower():
                 explanation["factors"].append({
                     "factor": "context_match",
                     "description": f"Rule match criteria '{rule.match_criteria.value}' found in task context"
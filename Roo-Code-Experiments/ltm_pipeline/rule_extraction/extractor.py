@@ -1,7 +1,8 @@
 """Rule extraction implementation for the LTM pipeline."""
 
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
 import time
 
@@ -14,6 +15,36 @@ from ..common.logger import get_logger
 from ..common.metrics import MetricsCollector
 
 
+# Common words skipped when extracting key terms
+_STOP_WORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "could", "should", "may", "might", "must", "shall",
+    "to", "of", "in", "for", "on", "with", "at", "by", "from"
+})
+
+# Imperative or directive phrases that make a single indicator enough
+_DIRECTIVE_WORDS = ("use", "prefer", "avoid", "ensure", "make sure", "remember")
+
+# Indicators that raise extraction confidence
+_STRONG_INDICATORS = ("always", "never", "must")
+
+# Languages recognized in text, with their display names
+_LANGUAGES = tuple(
+    (lang, lang.title())
+    for lang in ("javascript", "python", "typescript", "java", "go", "rust",
+                 "c++", "c#", "ruby", "php", "swift", "kotlin")
+)
+_LANGUAGE_TITLES = dict(_LANGUAGES)
+
+# Whole-word language mentions, so "go" doesn't match "google" and "java"
+# doesn't match "javascript". Lookarounds instead of \b since "c++" and
+# "c#" end in non-word characters
+_LANGUAGE_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(lang) for lang, _ in _LANGUAGES) + r")(?!\w)"
+)
+
+
 class RuleExtractor:
     """Extract rules from transcripts using pattern matching and NLP."""
     
@@ -29,14 +60,27 @@ class RuleExtractor:
         self.metrics = MetricsCollector("rule_extraction")
         self.confidence_threshold = confidence_threshold
         
-        # Default extraction patterns
-        self.patterns = extraction_patterns or {
-            "persistent_rule": r"(?i)(always|must|should|never)\s+(\w+.*?)(?:\.|$)",
-            "naming_rule": r"(?i)(use|prefer|follow)\s+(camelCase|snake_case|PascalCase|kebab-case)\s+(?:for\s+)?(\w+)",
-            "style_rule": r"(?i)(use|prefer)\s+(\d+|tabs?)\s+(spaces?|tabs?)\s+(?:for\s+)?(?:indentation|indent)",
-            "structure_rule": r"(?i)(organize|group|keep|separate)\s+(\w+.*?)\s+(?:by|in|together)",
-            "behavior_rule": r"(?i)(always|never|prefer)\s+(\w+.*?)\s+(?:before|after|when|over)\s+(\w+.*?)(?:\.|$)",
-            "convention_rule": r"(?i)(?:convention|standard|format|style)\s+(?:is|should be|must be)\s+(\w+.*?)(?:\.|$)"
+        # Default extraction patterns, compiled once so the per-segment loop
+        # goes straight to Pattern.finditer. They stay on the stdlib engine:
+        # segments are short lines and RE2 isn't a dependency
+        patterns = extraction_patterns or {
+            "persistent_rule": r"(always|must|should|never)\s+(\w+.*?)(?:\.|$)",
+            "naming_rule": r"(use|prefer|follow)\s+(camelCase|snake_case|PascalCase|kebab-case)\s+(?:for\s+)?(\w+)",
+            "style_rule": r"(use|prefer)\s+(\d+|tabs?)\s+(spaces?|tabs?)\s+(?:for\s+)?(?:indentation|indent)",
+            "structure_rule": r"(organize|group|keep|separate)\s+(\w+.*?)\s+(?:by|in|together)",
+            "behavior_rule": r"(always|never|prefer)\s+(\w+.*?)\s+(?:before|after|when|over)\s+(\w+.*?)(?:\.|$)",
+            "convention_rule": r"(?:convention|standard|format|style)\s+(?:is|should be|must be)\s+(\w+.*?)(?:\.|$)"
+        }
+        self.patterns = {
+            name: re.compile(pattern, re.IGNORECASE)
+            for name, pattern in patterns.items()
+        }
+        # Builder per pattern name, resolved once instead of per match. The
+        # patterns are still scanned one at a time: fusing them into a single
+        # alternation measured no faster with the backtracking `re` engine and
+        # would drop overlapping matches (e.g. persistent vs. behavior rules)
+        self._rule_builders = {
+            name: self._rule_builder_for(name) for name in self.patterns
         }
         
         # Rule type indicators
@@ -48,6 +92,25 @@ class RuleExtractor:
             "structure": ["organize", "group", "separate", "files", "modules", "directories"],
             "behavior": ["validate", "check", "log", "handle", "process", "before", "after"]
         }
+        # Distinct indicators across all groups, in declaration order, for
+        # checks that don't care which group an indicator belongs to
+        self._flat_indicators = tuple(dict.fromkeys(
+            indicator
+            for indicators in self.rule_indicators.values()
+            for indicator in indicators
+        ))
+        # All indicators as one literal alternation, so the presence check is
+        # a single scan of the text instead of one substring search per word
+        self._indicator_pattern = re.compile(
+            "|".join(re.escape(indicator) for indicator in self._flat_indicators)
+        )
+        # Indicator groups scored by _determine_rule_type, in tie-break order
+        self._type_indicators = (
+            (ActionType.NAMING, tuple(self.rule_indicators["naming"])),
+            (ActionType.STYLE, tuple(self.rule_indicators["style"])),
+            (ActionType.STRUCTURE, tuple(self.rule_indicators["structure"])),
+            (ActionType.BEHAVIOR, tuple(self.rule_indicators["behavior"]))
+        )
     
     def extract_rules(self, transcript: Transcript) -> List[Rule]:
         """Extract candidate rules from a transcript.
@@ -59,22 +122,11 @@ class RuleExtractor:
             List of extracted Rule objects
         """
         start_time = time.time()
-        rules = []
         
         self.logger.info(f"Starting rule extraction for transcript {transcript.id}")
         
-        for segment in transcript.segments:
-            # Skip irrelevant segments
-            if segment.type == RuleType.IRRELEVANT:
-                continue
-            
-            # Check if segment contains rule indicators
-            if self._contains_rule_indicator(segment.content):
-                extracted_rules = self._extract_rules_from_segment(segment, transcript.id)
-                rules.extend(extracted_rules)
-        
         # Post-process rules
-        rules = self._post_process_rules(rules)
+        rules = self._post_process_rules(list(self._iter_segment_rules(transcript)))
         
         processing_time = time.time() - start_time
         self.logger.log_rule_extraction(
@@ -89,52 +141,77 @@ class RuleExtractor:
         
         return rules
     
-    def _contains_rule_indicator(self, text: str) -> bool:
+    def _iter_segment_rules(self, transcript: Transcript) -> Iterator[Rule]:
+        """Yield candidate rules segment by segment, before post-processing.
+        
+        Segments are handled in this process, since extracting one costs less
+        than shipping it to a worker pool.
+        
+        Args:
+            transcript: Transcript to extract rules from
+            
+        Returns:
+            Iterator over extracted rules in segment order
+        """
+        for segment in transcript.segments:
+            # Skip irrelevant segments
+            if segment.type == RuleType.IRRELEVANT:
+                continue
+            
+            # Check if segment contains rule indicators
+            content_lower = segment.content.lower()
+            if self._contains_rule_indicator(segment.content, content_lower):
+                yield from self._extract_rules_from_segment(segment, transcript.id, content_lower)
+    
+    def _contains_rule_indicator(self, text: str,
+                                 text_lower: Optional[str] = None) -> bool:
         """Check if text likely contains a rule.
         
         Args:
             text: Text to check
+            text_lower: Already lowercased text, if the caller has it
             
         Returns:
             True if text likely contains a rule
         """
-        text_lower = text.lower()
-        
-        # Check for any rule indicators
-        for indicators in self.rule_indicators.values():
-            if any(indicator in text_lower for indicator in indicators):
-                return True
-        
-        return False
+        if text_lower is None:
+            text_lower = text.lower()
+        return self._indicator_pattern.search(text_lower) is not None
     
     def _extract_rules_from_segment(self, segment: TranscriptSegment, 
-                                   transcript_id: str) -> List[Rule]:
+                                   transcript_id: str,
+                                   content_lower: Optional[str] = None) -> List[Rule]:
         """Extract rules from a single segment.
         
         Args:
             segment: Segment to extract from
             transcript_id: ID of the parent transcript
+            content_lower: Already lowercased segment content, if the caller has it
             
         Returns:
             List of extracted rules
         """
         rules = []
         content = segment.content
+        if content_lower is None:
+            content_lower = content.lower()
+        
+        # Several rules of one type can come from the same segment, so
+        # confidence scores are kept per rule type while it is extracted
+        confidences: Dict[str, float] = {}
         
         # Try each extraction pattern
         for pattern_name, pattern in self.patterns.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            
-            for match in matches:
+            for match in pattern.finditer(content):
                 rule = self._create_rule_from_match(
-                    match, pattern_name, segment, transcript_id
+                    match, pattern_name, segment, transcript_id, content_lower, confidences
                 )
                 if rule and rule.confidence >= self.confidence_threshold:
                     rules.append(rule)
         
         # If no pattern matches, try general extraction
-        if not rules and self._is_likely_rule(content):
-            rule = self._create_general_rule(segment, transcript_id)
+        if not rules and self._is_likely_rule(content, content_lower):
+            rule = self._create_general_rule(segment, transcript_id, content_lower, confidences)
             if rule and rule.confidence >= self.confidence_threshold:
                 rules.append(rule)
         
@@ -142,7 +219,9 @@ class RuleExtractor:
     
     def _create_rule_from_match(self, match: re.Match, pattern_name: str,
                                segment: TranscriptSegment, 
-                               transcript_id: str) -> Optional[Rule]:
+                               transcript_id: str,
+                               content_lower: Optional[str] = None,
+                               confidences: Optional[Dict[str, float]] = None) -> Optional[Rule]:
         """Create a rule from a regex match.
         
         Args:
@@ -150,28 +229,45 @@ class RuleExtractor:
             pattern_name: Name of the pattern that matched
             segment: Source segment
             transcript_id: ID of the transcript
+            content_lower: Already lowercased segment content, if the caller has it
+            confidences: Confidence scores of the segment by rule type, filled
+                in as they are calculated
             
         Returns:
             Created Rule or None
         """
         try:
-            # Extract components based on pattern type
-            if "naming" in pattern_name:
-                return self._create_naming_rule(match, segment, transcript_id)
-            elif "style" in pattern_name:
-                return self._create_style_rule(match, segment, transcript_id)
-            elif "structure" in pattern_name:
-                return self._create_structure_rule(match, segment, transcript_id)
-            elif "behavior" in pattern_name:
-                return self._create_behavior_rule(match, segment, transcript_id)
-            else:
-                return self._create_general_rule(segment, transcript_id)
+            builder = self._rule_builders.get(pattern_name)
+            if builder is None:
+                return self._create_general_rule(segment, transcript_id, content_lower, confidences)
+            return builder(match, segment, transcript_id, content_lower, confidences)
         except Exception as e:
             self.logger.debug(f"Failed to create rule from match: {e}")
             return None
     
+    def _rule_builder_for(self, pattern_name: str):
+        """Pick the rule builder for an extraction pattern name.
+        
+        Args:
+            pattern_name: Name of the extraction pattern
+            
+        Returns:
+            Bound builder method, or None for general rules
+        """
+        # Extract components based on pattern type
+        if "naming" in pattern_name:
+            return self._create_naming_rule
+        elif "style" in pattern_name:
+            return self._create_style_rule
+        elif "structure" in pattern_name:
+            return self._create_structure_rule
+        elif "behavior" in pattern_name:
+            return self._create_behavior_rule
+        return None
+    
     def _create_naming_rule(self, match: re.Match, segment: TranscriptSegment,
-                           transcript_id: str) -> Rule:
+                           transcript_id: str, content_lower: Optional[str] = None,
+                           confidences: Optional[Dict[str, float]] = None) -> Rule:
         """Create a naming convention rule."""
         groups = match.groups()
         convention = groups[1] if len(groups) > 1 else "unknown"
@@ -181,7 +277,7 @@ class RuleExtractor:
             match_criteria=MatchCriteria(
                 type=MatchType.PATTERN,
                 value=f"{construct}.*naming",
-                context={"language": self._detect_language(segment.content)}
+                context={"language": self._detect_language(segment.content, content_lower)}
             ),
             action=Action(
                 type=ActionType.NAMING,
@@ -189,13 +285,14 @@ class RuleExtractor:
                 parameters={"convention": convention, "construct": construct}
             ),
             rationale=f"Naming convention specified in {segment.speaker} statement",
-            confidence=self._calculate_confidence(segment, "naming"),
+            confidence=self._calculate_confidence(segment, "naming", content_lower, confidences),
             source_id=transcript_id,
             timestamp=segment.timestamp
         )
     
     def _create_style_rule(self, match: re.Match, segment: TranscriptSegment,
-                          transcript_id: str) -> Rule:
+                          transcript_id: str, content_lower: Optional[str] = None,
+                          confidences: Optional[Dict[str, float]] = None) -> Rule:
         """Create a code style rule."""
         groups = match.groups()
         amount = groups[1] if len(groups) > 1 else "4"
@@ -213,13 +310,14 @@ class RuleExtractor:
                 parameters={"amount": amount, "unit": unit}
             ),
             rationale=f"Style preference from {segment.speaker}",
-            confidence=self._calculate_confidence(segment, "style"),
+            confidence=self._calculate_confidence(segment, "style", content_lower, confidences),
             source_id=transcript_id,
             timestamp=segment.timestamp
         )
     
     def _create_structure_rule(self, match: re.Match, segment: TranscriptSegment,
-                              transcript_id: str) -> Rule:
+                              transcript_id: str, content_lower: Optional[str] = None,
+                              confidences: Optional[Dict[str, float]] = None) -> Rule:
         """Create a project structure rule."""
         groups = match.groups()
         action_word = groups[0] if groups else "organize"
@@ -237,13 +335,14 @@ class RuleExtractor:
                 parameters={"action": action_word, "target": target}
             ),
             rationale=f"Project organization guideline",
-            confidence=self._calculate_confidence(segment, "structure"),
+            confidence=self._calculate_confidence(segment, "structure", content_lower, confidences),
             source_id=transcript_id,
             timestamp=segment.timestamp
         )
     
     def _create_behavior_rule(self, match: re.Match, segment: TranscriptSegment,
-                             transcript_id: str) -> Rule:
+                             transcript_id: str, content_lower: Optional[str] = None,
+                             confidences: Optional[Dict[str, float]] = None) -> Rule:
         """Create a behavioral rule."""
         groups = match.groups()
         modifier = groups[0] if groups else "always"
@@ -262,21 +361,24 @@ class RuleExtractor:
                 parameters={"modifier": modifier, "action": action, "condition": condition}
             ),
             rationale=f"Behavioral guideline from conversation",
-            confidence=self._calculate_confidence(segment, "behavior"),
+            confidence=self._calculate_confidence(segment, "behavior", content_lower, confidences),
             source_id=transcript_id,
             timestamp=segment.timestamp
         )
     
     def _create_general_rule(self, segment: TranscriptSegment,
-                            transcript_id: str) -> Rule:
+                            transcript_id: str, content_lower: Optional[str] = None,
+                            confidences: Optional[Dict[str, float]] = None) -> Rule:
         """Create a general rule when specific patterns don't match."""
         # Determine rule type from content
-        rule_type = self._determine_rule_type(segment.content)
+        if content_lower is None:
+            content_lower = segment.content.lower()
+        rule_type = self._determine_rule_type(segment.content, content_lower)
         
         return Rule(
             match_criteria=MatchCriteria(
                 type=MatchType.KEYWORD,
-                value=self._extract_key_terms(segment.content),
+                value=self._extract_key_terms(segment.content, content_lower),
                 context={"original_text": segment.content[:100]}
             ),
             action=Action(
@@ -285,37 +387,50 @@ class RuleExtractor:
                 parameters={}
             ),
             rationale="General rule extracted from conversation",
-            confidence=self._calculate_confidence(segment, "general"),
+            confidence=self._calculate_confidence(segment, "general", content_lower, confidences),
             source_id=transcript_id,
             timestamp=segment.timestamp
         )
     
-    def _is_likely_rule(self, text: str) -> bool:
+    def _is_likely_rule(self, text: str,
+                        text_lower: Optional[str] = None) -> bool:
         """Check if text is likely a rule even without pattern match."""
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
-        # Count rule indicators
+        # Count rule indicators, stopping as soon as two are found
         indicator_count = 0
-        for indicators in self.rule_indicators.values():
-            indicator_count += sum(1 for ind in indicators if ind in text_lower)
+        for ind in self._flat_indicators:
+            if ind in text_lower:
+                indicator_count += 1
+                if indicator_count >= 2:
+                    return True
         
-        # Check for imperative mood or directive language
-        directive_words = ["use", "prefer", "avoid", "ensure", "make sure", "remember"]
-        has_directive = any(word in text_lower for word in directive_words)
+        if not indicator_count:
+            return False
         
-        return indicator_count >= 2 or (indicator_count >= 1 and has_directive)
+        # A single indicator needs imperative mood or directive language
+        return any(word in text_lower for word in _DIRECTIVE_WORDS)
     
     def _calculate_confidence(self, segment: TranscriptSegment, 
-                             rule_type: str) -> float:
+                             rule_type: str,
+                             content_lower: Optional[str] = None,
+                             confidences: Optional[Dict[str, float]] = None) -> float:
         """Calculate confidence score for a rule.
         
         Args:
             segment: Source segment
             rule_type: Type of rule
+            content_lower: Already lowercased segment content, if the caller has it
+            confidences: Scores already calculated for the segment by rule
+                type; the new score is added to it
             
         Returns:
             Confidence score (0-1)
         """
+        if confidences is not None and rule_type in confidences:
+            return confidences[rule_type]
+        
         base_confidence = 0.5
         
         # Adjust based on segment type
@@ -333,58 +448,68 @@ class RuleExtractor:
             base_confidence += 0.1
         
         # Check for strong indicators
-        strong_indicators = ["always", "never", "must"]
-        if any(ind in segment.content.lower() for ind in strong_indicators):
+        if content_lower is None:
+            content_lower = segment.content.lower()
+        if any(ind in content_lower for ind in _STRONG_INDICATORS):
             base_confidence += 0.1
         
-        return min(base_confidence, 1.0)
+        confidence = min(base_confidence, 1.0)
+        if confidences is not None:
+            confidences[rule_type] = confidence
+        return confidence
     
-    def _determine_rule_type(self, text: str) -> ActionType:
+    def _determine_rule_type(self, text: str,
+                             text_lower: Optional[str] = None) -> ActionType:
         """Determine the action type for a rule based on text content."""
-        text_lower = text.lower()
-        
-        # Check each category
-        type_scores = {
-            ActionType.NAMING: sum(1 for ind in self.rule_indicators["naming"] if ind in text_lower),
-            ActionType.STYLE: sum(1 for ind in self.rule_indicators["style"] if ind in text_lower),
-            ActionType.STRUCTURE: sum(1 for ind in self.rule_indicators["structure"] if ind in text_lower),
-            ActionType.BEHAVIOR: sum(1 for ind in self.rule_indicators["behavior"] if ind in text_lower)
-        }
-        
-        # Return type with highest score, default to BEHAVIOR
-        return max(type_scores.items(), key=lambda x: x[1])[0] if max(type_scores.values()) > 0 else ActionType.BEHAVIOR
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        # Check each category. Scores count distinct indicators found as
+        # substrings; a single word-bounded alternation would change which
+        # texts match ("log" in "logging"), and an overlapping lookahead scan
+        # measured slower than these substring checks on longer segments.
+        # Return type with highest score, first on ties, default to BEHAVIOR
+        best_type, best_score = ActionType.BEHAVIOR, 0
+        for action_type, indicators in self._type_indicators:
+            score = sum(1 for ind in indicators if ind in text_lower)
+            if score > best_score:
+                best_type, best_score = action_type, score
+        
+        return best_type
     
-    def _extract_key_terms(self, text: str) -> str:
+    def _extract_key_terms(self, text: str,
+                           text_lower: Optional[str] = None) -> str:
         """Extract key terms from text for matching."""
+        if text_lower is None:
+            text_lower = text.lower()
+        
         # Simple keyword extraction
         important_words = []
-        words = text.lower().split()
-        
-        # Skip common words
-        stop_words = {"the", "a", "an", "is", "are", "was", "were", "be", "been", 
-                     "being", "have", "has", "had", "do", "does", "did", "will", 
-                     "would", "could", "should", "may", "might", "must", "shall",
-                     "to", "of", "in", "for", "on", "with", "at", "by", "from"}
+        words = text_lower.split()
         
+        # Whitespace split plus edge stripping is kept over a token regex,
+        # which would split words like "don't" or "(foo)" differently and
+        # change the extracted match values. Only the first few keepers are
+        # used, so stop scanning once there are enough
         for word in words:
             word = word.strip(".,!?;:")
-            if word and word not in stop_words and len(word) > 2:
+            # Skip common words
+            if len(word) > 2 and word not in _STOP_WORDS:
                 important_words.append(word)
+                if len(important_words) == 3:
+                    break
         
         # Return first few important words
-        return " ".join(important_words[:3]) if important_words else "general"
+        return " ".join(important_words) if important_words else "general"
     
-    def _detect_language(self, text: str) -> str:
-        """Detect programming language mentioned in text."""
-        languages = ["javascript", "python", "typescript", "java", "go", "rust", 
-                    "c++", "c#", "ruby", "php", "swift", "kotlin"]
-        
-        text_lower = text.lower()
-        for lang in languages:
-            if lang in text_lower:
-                return lang.title()
-        
-        return "General"
+    def _detect_language(self, text: str,
+                         text_lower: Optional[str] = None) -> str:
+        """Detect the first programming language mentioned in text."""
+        if text_lower is None:
+            text_lower = text.lower()
+        match = _LANGUAGE_PATTERN.search(text_lower)
+        
+        return _LANGUAGE_TITLES[match.group(1)] if match else "General"
     
     def _post_process_rules(self, rules: List[Rule]) -> List[Rule]:
         """Post-process extracted rules to remove duplicates and improve quality.
@@ -398,15 +523,13 @@ class RuleExtractor:
         if not rules:
             return rules
         
-        # Remove exact duplicates
-        unique_rules = []
-        seen_descriptions = set()
-        
+        # Remove exact duplicates, keeping the first rule per description
+        first_by_description = {}
         for rule in rules:
-            desc = rule.action.description.lower().strip()
-            if desc not in seen_descriptions:
-                seen_descriptions.add(desc)
-                unique_rules.append(rule)
+            first_by_description.setdefault(
+                rule.action.description.lower().strip(), rule
+            )
+        unique_rules = list(first_by_description.values())
         
         # Merge similar rules
         merged_rules = self._merge_similar_rules(unique_rules)
@@ -427,6 +550,29 @@ class RuleExtractor:
         if len(rules) <= 1:
             return rules
         
+        # Similar rules share action and match types and, unless one value
+        # has no words, at least one value word. Index rules by those keys so
+        # each rule is only checked against candidates instead of every
+        # later rule. Each rule looks its bucket up once: hashing the enum
+        # key goes through Enum.__hash__ in Python, so it isn't repeated
+        # per word
+        value_words = [self._value_words(rule) for rule in rules]
+        buckets = {}
+        rule_buckets = []
+        for idx, (rule, words) in enumerate(zip(rules, value_words)):
+            key = (rule.action.type, rule.match_criteria.type)
+            bucket = buckets.get(key)
+            if bucket is None:
+                # (all rules, rules by value word, rules without words)
+                bucket = buckets[key] = ([], defaultdict(list), [])
+            bucket_rules, word_rules, wordless_rules = bucket
+            bucket_rules.append(idx)
+            if not words:
+                wordless_rules.append(idx)
+            for word in words:
+                word_rules[word].append(idx)
+            rule_buckets.append(bucket)
+        
         merged = []
         processed = set()
         
@@ -434,10 +580,21 @@ class RuleExtractor:
             if i in processed:
                 continue
             
-            # Find similar rules
+            words1 = value_words[i]
+            bucket_rules, word_rules, wordless_rules = rule_buckets[i]
+            if words1:
+                candidates = set(wordless_rules)
+                for word in words1:
+                    candidates.update(word_rules[word])
+            else:
+                candidates = bucket_rules
+            
+            # Find similar rules. Each group only takes rules similar to its
+            # first rule, so rules sharing no value words are never chained
             similar_indices = [i]
-            for j, rule2 in enumerate(rules[i+1:], i+1):
-                if j not in processed and self._are_rules_similar(rule1, rule2):
+            for j in sorted(candidates):
+                if (j > i and j not in processed
+                        and self._words_similar(words1, value_words[j])):
                     similar_indices.append(j)
                     processed.add(j)
             
@@ -459,19 +616,21 @@ class RuleExtractor:
         # Check if match criteria are similar
         if rule1.match_criteria.type == rule2.match_criteria.type:
             # Simple similarity check on values
-            value1 = rule1.match_criteria.value.lower()
-            value2 = rule2.match_criteria.value.lower()
-            
-            # Check for common words
-            words1 = set(value1.split())
-            words2 = set(value2.split())
-            common = words1 & words2
-            
-            if len(common) >= min(len(words1), len(words2)) * 0.5:
-                return True
+            return self._words_similar(self._value_words(rule1),
+                                       self._value_words(rule2))
         
         return False
     
+    def _value_words(self, rule: Rule) -> frozenset:
+        """Lowercased words of a rule's match criteria value."""
+        return frozenset(rule.match_criteria.value.lower().split())
+    
+    def _words_similar(self, words1: frozenset, words2: frozenset) -> bool:
+        """Check whether two value word sets share enough words to merge."""
+        # Check for common words
+        common = words1 & words2
+        return len(common) >= min(len(words1), len(words2)) * 0.5
+    
     def _merge_rules(self, rules: List[Rule]) -> Rule:
         """Merge multiple similar rules into one."""
         # Use the rule with highest confidence as base
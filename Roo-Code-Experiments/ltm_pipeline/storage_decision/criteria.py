@@ -1,12 +1,91 @@
 """Storage criteria definitions for evaluating rules."""
 
-from typing import Dict, Any, List, Optional
+import re
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from ..common.models import Rule, RuleType
 
 
+# Keywords marking a persistent pattern or convention
+_PERSISTENT_KEYWORDS = frozenset({"always", "never", "convention", "standard", "must", "should"})
+
+# Keywords and phrases limiting a rule to the current session
+_TEMPORAL_KEYWORDS = frozenset({"today", "now", "currently", "temporarily"})
+_TEMPORAL_PHRASES = ("for this",)
+
+# Standardization keywords, in reporting order
+_STANDARDIZATION_KEYWORDS = ("standard", "convention", "consistent", "uniform", "always", "never")
+
+# Terms that make a rule overly broad
+_BROAD_TERMS = frozenset({"all", "any", "every", "always", "never"})
+
+# Keywords above at the start of a word, so inflected forms ("conventions",
+# "shouldn't") count but words merely containing one ("know", "install") don't
+_KEYWORD_PATTERN = re.compile(r"\b(" + "|".join(sorted(
+    _PERSISTENT_KEYWORDS | _TEMPORAL_KEYWORDS | set(_STANDARDIZATION_KEYWORDS) | _BROAD_TERMS,
+    key=len, reverse=True
+)) + ")")
+
+# Clear-trigger score and reasoning by match type value
+_TRIGGER_MATCH_TYPE_SCORES = {
+    "pattern": (0.4, "Pattern-based matching"),
+    "keyword": (0.3, "Keyword-based matching"),
+    "context": (0.2, "Context-based matching")
+}
+
+# Clear-trigger score and reasoning by match value word count, capped at 3
+_TRIGGER_VALUE_SCORES = (
+    (0.1, "Generic match value"),
+    (0.1, "Generic match value"),
+    (0.2, "Moderately specific match value"),
+    (0.3, "Specific match value")
+)
+
+# Specificity adjustment and reasoning by match value word count, capped at 3
+_SPECIFICITY_VALUE_SCORES = (
+    None,
+    (-0.2, "Generic match criteria"),
+    (0.1, "Moderately specific match criteria"),
+    (0.3, "Highly specific match criteria")
+)
+
+# Language that enforces a rule
+_ENFORCEMENT_WORDS = ("must", "should", "require")
+
+# Keyword pairs marking contradictory actions, matched as substrings
+_OPPOSITE_KEYWORDS = (
+    ("always", "never"),
+    ("must", "must not"),
+    ("should", "should not"),
+    ("use", "avoid"),
+    ("enable", "disable")
+)
+_CONTRADICTION_KEYWORDS = tuple(dict.fromkeys(
+    keyword for pair in _OPPOSITE_KEYWORDS for keyword in pair
+))
+
+
+def _text_features_of(rule: Rule) -> Tuple[str, frozenset, Tuple[str, ...]]:
+    """Compute the text features of a rule (see StorageCriteria._text_features)."""
+    description_lower = rule.action.description.lower()
+    value = rule.match_criteria.value
+    return (
+        description_lower,
+        frozenset(_KEYWORD_PATTERN.findall(description_lower)),
+        tuple(value.split()) if value else ()
+    )
+
+
+def _contradiction_keywords_of(action: Any) -> frozenset:
+    """Find the keywords from _OPPOSITE_KEYWORDS present in an action description."""
+    description_lower = action.description.lower()
+    return frozenset(keyword for keyword in _CONTRADICTION_KEYWORDS if keyword in description_lower)
+
+
 class CriterionType(Enum):
     """Types of criteria for storage decisions."""
     CROSS_SESSION_VALUE = "cross_session_value"
@@ -47,6 +126,16 @@ class StorageCriteria:
         # Normalize weights
         total = sum(self.weights.values())
         self.weights = {k: v/total for k, v in self.weights.items()}
+        
+        # Weights keyed by criterion, and as a vector in CriterionType order
+        # for batch scoring
+        self._criterion_weights = {
+            criterion: self.weights.get(criterion.value, 0.0) for criterion in CriterionType
+        }
+        self._weight_vector = np.array(
+            [self._criterion_weights[criterion] for criterion in CriterionType],
+            dtype=np.float64
+        )
     
     def evaluate_all_criteria(self, rule: Rule, context: Optional[Dict[str, Any]] = None) -> List[CriterionResult]:
         """Evaluate a rule against all criteria.
@@ -70,6 +159,33 @@ class StorageCriteria:
         
         return results
     
+    def evaluate_batch(self, rules: List[Rule],
+                       context: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Score many rules against all criteria.
+        
+        The existing rules in the context are indexed once for the whole
+        batch, and the weighted scores come from one matrix product.
+        
+        Args:
+            rules: Rules to evaluate
+            context: Additional context shared by all rules
+            
+        Returns:
+            Tuple of (score matrix of shape (n_rules, n_criteria) in
+            CriterionType order, weighted scores)
+        """
+        if context and "existing_rules" in context and context.get("existing_rule_index") is None:
+            context = {
+                **context,
+                "existing_rule_index": self.build_rule_index(context["existing_rules"])
+            }
+        
+        score_matrix = np.zeros((len(rules), len(CriterionType)), dtype=np.float64)
+        for row, rule in enumerate(rules):
+            score_matrix[row] = [result.score for result in self.evaluate_all_criteria(rule, context)]
+        
+        return score_matrix, self.calculate_weighted_scores(score_matrix)
+    
     def evaluate_cross_session_value(self, rule: Rule, context: Optional[Dict[str, Any]] = None) -> CriterionResult:
         """Evaluate if rule has value across multiple sessions.
         
@@ -87,9 +203,8 @@ class StorageCriteria:
             reasoning_parts.append("Rule is marked as persistent")
         
         # Check for persistent keywords in action description
-        persistent_keywords = ["always", "never", "convention", "standard", "must", "should"]
-        description_lower = rule.action.description.lower()
-        keyword_count = sum(1 for kw in persistent_keywords if kw in description_lower)
+        description_lower, description_keywords, _ = self._text_features(rule)
+        keyword_count = len(_PERSISTENT_KEYWORDS & description_keywords)
         
         if keyword_count > 0:
             score += min(0.3 * keyword_count, 0.6)
@@ -101,8 +216,8 @@ class StorageCriteria:
             reasoning_parts.append("Has broad matching criteria")
         
         # Check for temporal limitations
-        temporal_keywords = ["today", "now", "currently", "temporarily", "for this"]
-        if any(kw in description_lower for kw in temporal_keywords):
+        if (not _TEMPORAL_KEYWORDS.isdisjoint(description_keywords) or
+                any(phrase in description_lower for phrase in _TEMPORAL_PHRASES)):
             score *= 0.5
             reasoning_parts.append("Contains temporal limitations")
         
@@ -146,14 +261,16 @@ class StorageCriteria:
             reasoning_parts.append("Clear action type (naming/style)")
         
         # Check for specific match criteria
-        if rule.match_criteria.value and len(rule.match_criteria.value.split()) >= 2:
+        if len(self._text_features(rule)[2]) >= 2:
             score += 0.1
             reasoning_parts.append("Specific match criteria")
         
         # Check for potential conflicts (simplified check)
         if context and "existing_rules" in context:
             existing_rules = context["existing_rules"]
-            conflicts = self._check_conflicts(rule, existing_rules)
+            conflicts = self._check_conflicts(
+                rule, existing_rules, context.get("existing_rule_index")
+            )
             if conflicts:
                 score -= 0.3
                 reasoning_parts.append(f"Potential conflicts with {len(conflicts)} existing rule(s)")
@@ -179,28 +296,17 @@ class StorageCriteria:
         reasoning_parts = []
         
         # Check match criteria type
-        if rule.match_criteria.type.value == "pattern":
-            score += 0.4
-            reasoning_parts.append("Pattern-based matching")
-        elif rule.match_criteria.type.value == "keyword":
-            score += 0.3
-            reasoning_parts.append("Keyword-based matching")
-        elif rule.match_criteria.type.value == "context":
-            score += 0.2
-            reasoning_parts.append("Context-based matching")
+        type_score = _TRIGGER_MATCH_TYPE_SCORES.get(rule.match_criteria.type.value)
+        if type_score:
+            score += type_score[0]
+            reasoning_parts.append(type_score[1])
         
         # Check match value specificity
         if rule.match_criteria.value:
-            value_words = rule.match_criteria.value.split()
-            if len(value_words) >= 3:
-                score += 0.3
-                reasoning_parts.append("Specific match value")
-            elif len(value_words) >= 2:
-                score += 0.2
-                reasoning_parts.append("Moderately specific match value")
-            else:
-                score += 0.1
-                reasoning_parts.append("Generic match value")
+            value_words = self._text_features(rule)[2]
+            value_score, value_reason = _TRIGGER_VALUE_SCORES[min(len(value_words), 3)]
+            score += value_score
+            reasoning_parts.append(value_reason)
         
         # Check for context information
         if rule.match_criteria.context:
@@ -233,10 +339,9 @@ class StorageCriteria:
         reasoning_parts = []
         
         # Check for standardization keywords
-        standardization_keywords = ["standard", "convention", "consistent", "uniform", "always", "never"]
-        description_lower = rule.action.description.lower()
+        description_lower, description_keywords, _ = self._text_features(rule)
         
-        keyword_matches = [kw for kw in standardization_keywords if kw in description_lower]
+        keyword_matches = [kw for kw in _STANDARDIZATION_KEYWORDS if kw in description_keywords]
         if keyword_matches:
             score += min(0.2 * len(keyword_matches), 0.6)
             reasoning_parts.append(f"Contains standardization keywords: {', '.join(keyword_matches)}")
@@ -247,7 +352,7 @@ class StorageCriteria:
             reasoning_parts.append(f"Enforces {rule.action.type.value} consistency")
         
         # Check if rule prevents variations
-        if any(word in description_lower for word in ["must", "should", "require"]):
+        if any(word in description_lower for word in _ENFORCEMENT_WORDS):
             score += 0.2
             reasoning_parts.append("Contains enforcement language")
         
@@ -278,17 +383,12 @@ class StorageCriteria:
         reasoning_parts = []
         
         # Check match criteria specificity
+        _, description_keywords, value_words = self._text_features(rule)
         if rule.match_criteria.value:
-            value_length = len(rule.match_criteria.value.split())
-            if value_length >= 3:
-                score += 0.3
-                reasoning_parts.append("Highly specific match criteria")
-            elif value_length == 2:
-                score += 0.1
-                reasoning_parts.append("Moderately specific match criteria")
-            elif value_length == 1:
-                score -= 0.2
-                reasoning_parts.append("Generic match criteria")
+            value_score = _SPECIFICITY_VALUE_SCORES[min(len(value_words), 3)]
+            if value_score:
+                score += value_score[0]
+                reasoning_parts.append(value_score[1])
         
         # Check for context constraints
         if rule.match_criteria.context:
@@ -303,9 +403,7 @@ class StorageCriteria:
             reasoning_parts.append(f"Has {param_count} action parameter(s)")
         
         # Penalize overly broad rules
-        broad_terms = ["all", "any", "every", "always", "never"]
-        description_lower = rule.action.description.lower()
-        broad_count = sum(1 for term in broad_terms if term in description_lower)
+        broad_count = len(_BROAD_TERMS & description_keywords)
         if broad_count > 1:
             score -= 0.2
             reasoning_parts.append("Contains multiple broad terms")
@@ -351,37 +449,117 @@ class StorageCriteria:
         Returns:
             Weighted score (0.0 to 1.0)
         """
+        # A plain loop beats a numpy dot product for six results; use
+        # calculate_weighted_scores to score many rules at once
         total_score = 0.0
         
         for result in criterion_results:
-            weight = self.weights.get(result.criterion_type.value, 0.0)
+            weight = self._criterion_weights.get(result.criterion_type, 0.0)
             total_score += result.score * weight
         
         return total_score
     
-    def _check_conflicts(self, rule: Rule, existing_rules: List[Rule]) -> List[Rule]:
+    def calculate_weighted_scores(self, score_matrix: np.ndarray) -> np.ndarray:
+        """Calculate weighted scores for many rules at once.
+        
+        Args:
+            score_matrix: Array of shape (n_rules, n_criteria) with criterion
+                scores in CriterionType order
+            
+        Returns:
+            Array of n_rules weighted scores
+        """
+        return np.asarray(score_matrix, dtype=np.float64) @ self._weight_vector
+    
+    def _text_features(self, rule: Rule) -> Tuple[str, frozenset, Tuple[str, ...]]:
+        """Get the description and match value text the criteria check.
+        
+        Derived once per rule (see Rule.derived), since evaluate_all_criteria
+        runs several criteria over the same strings. With the description
+        keywords as a frozenset, each keyword count is one C-level set
+        intersection, so there is no per-keyword loop left to compile.
+        
+        Args:
+            rule: Rule to get text features for
+            
+        Returns:
+            Tuple of (lowercased description, description keywords, match value words)
+        """
+        return rule.derived("criteria_text_features", _text_features_of)
+    
+    def build_rule_index(self, rules: List[Rule]) -> Dict[str, Any]:
+        """Index existing rules for conflict checks.
+        
+        Build once per set of existing rules and pass it in the evaluation
+        context as "existing_rule_index" to avoid a full scan per rule.
+        
+        Args:
+            rules: Existing rules to index
+            
+        Returns:
+            Dictionary with the indexed "rules", their positions keyed
+            "by_match" (match type and value) and "by_action_type", and
+            "contradiction_keywords" (position -> keywords), filled in as
+            conflict checks need them
+        """
+        by_match = {}
+        by_action_type = {}
+        for position, existing in enumerate(rules):
+            match_key = (existing.match_criteria.type, existing.match_criteria.value)
+            by_match.setdefault(match_key, []).append(position)
+            by_action_type.setdefault(existing.action.type, []).append(position)
+        
+        return {
+            "rules": rules,
+            "by_match": by_match,
+            "by_action_type": by_action_type,
+            "contradiction_keywords": {}
+        }
+    
+    def _check_conflicts(self, rule: Rule, existing_rules: List[Rule],
+                         rule_index: Optional[Dict[str, Any]] = None) -> List[Rule]:
         """Check for potential conflicts with existing rules.
         
         Args:
             rule: Rule to check
             existing_rules: List of existing rules
+            rule_index: Index of existing_rules from build_rule_index
             
         Returns:
             List of potentially conflicting rules
         """
+        if rule_index is None or rule_index["rules"] is not existing_rules:
+            rule_index = self.build_rule_index(existing_rules)
+        
+        # Only rules sharing the match criteria or the action type can conflict
+        positions = set(rule_index["by_match"].get(
+            (rule.match_criteria.type, rule.match_criteria.value), ()
+        ))
+        positions.update(rule_index["by_action_type"].get(rule.action.type, ()))
+        
         conflicts = []
+        keyword_cache = rule_index["contradiction_keywords"]
+        rule_keywords = None
         
-        for existing in existing_rules:
+        for position in sorted(positions):
+            existing = existing_rules[position]
+            
             # Simple conflict detection based on same match criteria but different actions
             if (rule.match_criteria.type == existing.match_criteria.type and
                 rule.match_criteria.value == existing.match_criteria.value and
                 rule.action.description != existing.action.description):
                 conflicts.append(existing)
             
-            # Check for contradictory actions on same target
-            if (rule.action.type == existing.action.type and
-                self._are_actions_contradictory(rule.action, existing.action)):
-                conflicts.append(existing)
+            # Check for contradictory actions on same target. Each existing
+            # action is scanned once per index, not once per rule checked.
+            if rule.action.type == existing.action.type:
+                existing_keywords = keyword_cache.get(position)
+                if existing_keywords is None:
+                    existing_keywords = keyword_cache[position] = _contradiction_keywords_of(existing.action)
+                if rule_keywords is None:
+                    rule_keywords = _contradiction_keywords_of(rule.action)
+                if self._keywords_contradict(rule_keywords, existing_keywords):
+                    conflicts.append(existing)
         
         return conflicts
     
@@ -396,20 +574,23 @@ class StorageCriteria:
             True if actions are contradictory
         """
         # Simple contradiction detection
-        desc1 = action1.description.lower()
-        desc2 = action2.description.lower()
+        return self._keywords_contradict(_contradiction_keywords_of(action1),
+                                         _contradiction_keywords_of(action2))
+    
+    def _keywords_contradict(self, keywords1: frozenset, keywords2: frozenset) -> bool:
+        """Check if two sets of contradiction keywords hold an opposite pair.
         
+        Args:
+            keywords1: Contradiction keywords of the first action
+            keywords2: Contradiction keywords of the second action
+            
+        Returns:
+            True if one set holds a keyword and the other its opposite
+        """
         # Check for opposite keywords
-        opposites = [
-            ("always", "never"),
-            ("must", "must not"),
-            ("should", "should not"),
-            ("use", "avoid"),
-            ("enable", "disable")
-        ]
-        
-        for word1, word2 in opposites:
-            if (word1 in desc1 and word2 in desc2) or (word2 in desc1 and word1 in desc2):
+        for word1, word2 in _OPPOSITE_KEYWORDS:
+            if ((word1 in keywords1 and word2 in keywords2) or
+                    (word2 in keywords1 and word1 in keywords2)):
                 return True
         
         return False
\ No newline at end of file
@@ -51,10 +51,13 @@ class StorageDecisionMaker:
         if context and "existing_rules" in context:
             existing_rules = context["existing_rules"]
             self.logger.info(f"Considering {len(existing_rules)} existing rules for conflict detection")
+        existing_rule_index = self.criteria.build_rule_index(existing_rules)
         
         # Evaluate each rule
         for rule in rules:
-            decision, justification, score = self._evaluate_single_rule(rule, existing_rules)
+            decision, justification, score = self._evaluate_single_rule(
+                rule, existing_rules, existing_rule_index
+            )
             results.append((rule, decision, justification))
             
             # Log decision
@@ -87,12 +90,14 @@ class StorageDecisionMaker:
     
     def _evaluate_single_rule(self, 
                              rule: Rule, 
-                             existing_rules: List[Rule]) -> Tuple[str, str, float]:
+                             existing_rules: List[Rule],
+                             existing_rule_index: Optional[Dict[str, Any]] = None) -> Tuple[str, str, float]:
         """Evaluate a single rule for storage.
         
         Args:
             rule: Rule to evaluate
             existing_rules: List of existing rules for conflict checking
+            existing_rule_index: Conflict index of existing_rules, built if omitted
             
         Returns:
             Tuple of (decision, justification, score)
@@ -100,6 +105,7 @@ class StorageDecisionMaker:
         # Evaluate against all criteria
         context = {
             "existing_rules": existing_rules,
+            "existing_rule_index": existing_rule_index,
             "rule_type": getattr(rule, "type", None)
         }
         
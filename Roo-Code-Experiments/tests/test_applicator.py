@@ -0,0 +1,115 @@
+"""Tests for RuleApplicator decision caching."""
+
+import logging
+import unittest
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType, Task
+from ltm_pipeline.retrieval_application import SimulatedLTMStorage, RuleApplicator
+from ltm_pipeline.retrieval_application.applicator import _TaskView
+
+
+def _naming_rule() -> Rule:
+    """Create a keyword rule converting variable names to snake_case."""
+    return Rule(
+        id="naming",
+        match_criteria=MatchCriteria(MatchType.KEYWORD, "variables"),
+        action=Action(ActionType.NAMING, "Use snake_case for variables")
+    )
+
+
+def _naming_task() -> Task:
+    """Create a task the naming rule applies to."""
+    return Task(
+        id="task-0",
+        type="code_generation",
+        language="python",
+        description="Create variables for the user profile",
+        context={"variables_needed": ["userName", "user_age"]}
+    )
+
+
+class TestDecisionCache(unittest.TestCase):
+    """Memoized (rule, task) decisions."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.applicator = RuleApplicator(SimulatedLTMStorage())
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_cached_modifications_are_independent(self):
+        rule, task = _naming_rule(), _naming_task()
+        first = self.applicator.apply_rules_to_task(task, [rule]).modifications[0]
+        first.changes[0].items[0]["converted"] = "edited"
+        first.changes.clear()
+        
+        second = self.applicator.apply_rules_to_task(task, [rule]).modifications[0]
+        third = self.applicator.apply_rules_to_task(task, [rule]).modifications[0]
+        self.assertEqual(second.changes[0].items, [{"original": "userName", "converted": "user_name"}])
+        self.assertIsNot(second, third)
+        self.assertIsNot(second.changes[0].items[0], third.changes[0].items[0])
+    
+    def test_changed_rule_is_decided_again(self):
+        rule, task = _naming_rule(), _naming_task()
+        self.applicator.apply_rules_to_task(task, [rule])
+        
+        rule.action.description = "Use camelCase for variables"
+        modification = self.applicator.apply_rules_to_task(task, [rule]).modifications[0]
+        self.assertEqual(modification.description, "Use camelCase for variables")
+        self.assertEqual(modification.changes[0].items, [{"original": "user_age", "converted": "userAge"}])
+
+
+class TestHotPredicates(unittest.TestCase):
+    """Specialized predicates for frequently evaluated rules."""
+    
+    RULES = [
+        Rule(id="keyword", match_criteria=MatchCriteria(MatchType.KEYWORD, "Variables"),
+             action=Action(ActionType.NAMING, "Use snake_case")),
+        Rule(id="pattern", match_criteria=MatchCriteria(MatchType.PATTERN, "profile", {"language": "Python"}),
+             action=Action(ActionType.STYLE, "Use 4 spaces")),
+        Rule(id="general", match_criteria=MatchCriteria(MatchType.PATTERN, "fix", {"language": "general"}),
+             action=Action(ActionType.BEHAVIOR, "Add logging")),
+        Rule(id="context", match_criteria=MatchCriteria(MatchType.CONTEXT, "", {"framework": "django"}),
+             action=Action(ActionType.STRUCTURE, "Separate views")),
+        Rule(id="unconstrained", match_criteria=MatchCriteria(MatchType.CONTEXT, ""),
+             action=Action(ActionType.STRUCTURE, "Group models"))
+    ]
+    
+    TASKS = [
+        _naming_task(),
+        Task(id="task-1", type="debugging", language="Java", description="Fix the login error"),
+        Task(id="task-2", type="refactoring", language="", description="Tidy the profile views",
+             context={"framework": "django"}),
+        Task(id="task-3", type="organization", language="python", description="Split modules",
+             context={"framework": "flask"})
+    ]
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.applicator = RuleApplicator(SimulatedLTMStorage(), hot_rule_threshold=1)
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_hot_predicates_match_generic_check(self):
+        for rule in self.RULES:
+            predicate = self.applicator._compile_hot_rule(rule)
+            for task in self.TASKS:
+                with self.subTest(rule=rule.id, task=task.id):
+                    self.assertEqual(predicate(task, _TaskView.of(task)),
+                                     self.applicator._should_apply_rule(rule, task))
+    
+    def test_hot_rules_give_same_results(self):
+        reference = RuleApplicator(SimulatedLTMStorage(), decision_cache_size=0, hot_rule_threshold=10 ** 9)
+        for _ in range(3):
+            for task in self.TASKS:
+                hot = self.applicator.apply_rules_to_task(task, self.RULES)
+                expected = reference.apply_rules_to_task(task, self.RULES)
+                self.assertEqual(hot.applied_rules, expected.applied_rules)
+                self.assertEqual(hot.skipped_rules, expected.skipped_rules)
+        self.assertEqual(len(self.applicator._hot_predicates), len(self.RULES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests for StorageCriteria keyword scoring."""
+
+import unittest
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType
+from ltm_pipeline.storage_decision.criteria import StorageCriteria
+
+
+def _rule(description: str, value: str, action_type: ActionType) -> Rule:
+    """Create a pattern rule with the given action description."""
+    return Rule(
+        match_criteria=MatchCriteria(MatchType.PATTERN, value),
+        action=Action(action_type, description),
+        confidence=0.7
+    )
+
+
+class TestKeywordScoring(unittest.TestCase):
+    """Keyword checks over rule descriptions."""
+    
+    def setUp(self):
+        self.criteria = StorageCriteria()
+    
+    def _weighted_score(self, rule: Rule) -> float:
+        return self.criteria.calculate_weighted_score(self.criteria.evaluate_all_criteria(rule))
+    
+    def test_plural_keywords_count(self):
+        rule = _rule("Follow the team naming conventions and standards", "naming", ActionType.NAMING)
+        
+        self.assertEqual(self.criteria.evaluate_cross_session_value(rule).metadata["keyword_count"], 2)
+        self.assertEqual(self.criteria.evaluate_reduces_inconsistency(rule).metadata["keywords_found"],
+                         ["standard", "convention"])
+        self.assertAlmostEqual(self._weighted_score(rule), 0.695)
+    
+    def test_negated_keywords_count(self):
+        rule = _rule("You shouldn't use tabs; always use spaces", "tabs", ActionType.STYLE)
+        
+        self.assertEqual(self.criteria.evaluate_cross_session_value(rule).metadata["keyword_count"], 2)
+        self.assertAlmostEqual(self._weighted_score(rule), 0.695)
+    
+    def test_keywords_inside_words_do_not_count(self):
+        rule = _rule("Install the packages you know about", "install", ActionType.BEHAVIOR)
+        
+        result = self.criteria.evaluate_cross_session_value(rule)
+        self.assertEqual(result.metadata["keyword_count"], 0)
+        self.assertNotIn("temporal", result.reasoning)
+        self.assertEqual(self.criteria.evaluate_reduces_inconsistency(
+            _rule("Avoid inconsistent spacing", "spacing", ActionType.STYLE)
+        ).metadata["keywords_found"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
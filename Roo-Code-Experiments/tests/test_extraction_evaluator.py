@@ -0,0 +1,73 @@
+"""Tests for ExtractionEvaluator batch evaluation and match caching."""
+
+import logging
+import unittest
+
+from ltm_pipeline.rule_extraction import RuleExtractor, ExtractionEvaluator
+from ltm_pipeline.utils.data_generator import SyntheticDataGenerator
+
+
+def _extraction_results(num_transcripts: int):
+    """Extract rules from synthetic transcripts and pair them with their ground truth."""
+    generator = SyntheticDataGenerator(seed=11)
+    extractor = RuleExtractor()
+    results = []
+    for i in range(num_transcripts):
+        transcript = generator.generate_transcript({"persistent": 0.5, "short_term": 0.2, "irrelevant": 0.3})
+        results.append({
+            "transcript_id": transcript.id,
+            "extracted": extractor.extract_rules(transcript),
+            "ground_truth": generator.generate_ground_truth(transcript)
+        })
+    return results
+
+
+def _without_timings(metrics):
+    """Drop the wall-clock timings from per-transcript metrics."""
+    return [{key: value for key, value in m.items() if key != "evaluation_time"} for m in metrics]
+
+
+class TestEvaluateBatch(unittest.TestCase):
+    """Batch evaluation across worker processes."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.results = _extraction_results(6)
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_workers_match_in_process_evaluation(self):
+        in_process = ExtractionEvaluator(similarity_threshold=0.4).evaluate_batch(self.results)
+        parallel = ExtractionEvaluator(similarity_threshold=0.4).evaluate_batch(self.results, max_workers=2)
+        self.assertGreater(in_process["overall"]["recall"], 0.0)
+        
+        self.assertEqual(parallel["overall"], in_process["overall"])
+        self.assertEqual(parallel["by_type"], in_process["by_type"])
+        self.assertEqual(parallel["statistics"], in_process["statistics"])
+        self.assertEqual(_without_timings(parallel["individual_results"]),
+                         _without_timings(in_process["individual_results"]))
+
+
+class TestMatchCache(unittest.TestCase):
+    """Memoized rule matching."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.results = _extraction_results(3)
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_cache_keeps_most_recent_results(self):
+        evaluator = ExtractionEvaluator(similarity_threshold=0.4, cache_matches=True, match_cache_size=2)
+        first = [evaluator.evaluate(r["extracted"], r["ground_truth"]) for r in self.results]
+        self.assertEqual(len(evaluator._match_cache), 2)
+        
+        again = [evaluator.evaluate(r["extracted"], r["ground_truth"]) for r in self.results]
+        self.assertEqual(len(evaluator._match_cache), 2)
+        self.assertEqual(_without_timings(again), _without_timings(first))
+
+
+if __name__ == "__main__":
+    unittest.main()
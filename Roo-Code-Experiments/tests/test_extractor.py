@@ -0,0 +1,109 @@
+"""Tests for RuleExtractor language detection and rule merging."""
+
+import logging
+import random
+import unittest
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType
+from ltm_pipeline.rule_extraction import RuleExtractor
+
+
+def _rule(rule_id: str, value: str, action_type: ActionType = ActionType.NAMING,
+          match_type: MatchType = MatchType.KEYWORD) -> Rule:
+    """Create a rule with the given match value."""
+    return Rule(
+        id=rule_id,
+        match_criteria=MatchCriteria(match_type, value),
+        action=Action(action_type, f"Rule about {value or 'everything'}")
+    )
+
+
+def _groups(merged):
+    """Read the IDs each merged rule was built from."""
+    return [rule.metadata.get("merged_from", [rule.id]) for rule in merged]
+
+
+class TestDetectLanguage(unittest.TestCase):
+    """Whole-word language detection."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.extractor = RuleExtractor()
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_language_inside_word_is_ignored(self):
+        self.assertEqual(self.extractor._detect_language("Search it on google first"), "General")
+    
+    def test_javascript_is_not_java(self):
+        self.assertEqual(self.extractor._detect_language("Always use camelCase in JavaScript"), "Javascript")
+    
+    def test_language_ending_in_symbol(self):
+        self.assertEqual(self.extractor._detect_language("prefer RAII in c++ code"), "C++")
+
+
+class TestMergeSimilarRules(unittest.TestCase):
+    """Grouping of similar extracted rules."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.extractor = RuleExtractor()
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_similarity_is_not_chained(self):
+        # a~b and b~c, but a and c share no value words
+        rules = [_rule("a", "functions snake_case"), _rule("b", "functions snake_case constants pascalcase"),
+                 _rule("c", "constants pascalcase")]
+        
+        self.assertEqual(_groups(self.extractor._merge_similar_rules(rules)), [["a", "b"], ["c"]])
+    
+    def test_unrelated_rules_stay_separate(self):
+        rules = [_rule("indent", "indentation log"), _rule("always", "always when variables"),
+                 _rule("tabs", "tabs javascript files"), _rule("style", "indentation log", ActionType.STYLE)]
+        
+        self.assertEqual(_groups(self.extractor._merge_similar_rules(rules)),
+                         [["indent"], ["always"], ["tabs"], ["style"]])
+    
+    def test_groups_match_pairwise_comparison(self):
+        rng = random.Random(3)
+        words = ["always", "use", "tabs", "spaces", "log", "errors", "variables", "functions"]
+        
+        for trial in range(50):
+            rules = [
+                _rule(f"r{i}", " ".join(rng.sample(words, rng.randint(0, 3))),
+                      rng.choice([ActionType.NAMING, ActionType.STYLE]),
+                      rng.choice([MatchType.KEYWORD, MatchType.PATTERN]))
+                for i in range(rng.randint(2, 25))
+            ]
+            
+            # Each unprocessed rule takes every later similar rule, checking all pairs
+            expected, processed = [], set()
+            for i, rule1 in enumerate(rules):
+                if i in processed:
+                    continue
+                group = [rule1.id]
+                for j in range(i + 1, len(rules)):
+                    if j not in processed and self.extractor._are_rules_similar(rule1, rules[j]):
+                        group.append(rules[j].id)
+                        processed.add(j)
+                expected.append(group)
+            
+            with self.subTest(trial=trial):
+                self.assertEqual(_groups(self.extractor._merge_similar_rules(rules)), expected)
+    
+    def test_merged_rule_combines_descriptions(self):
+        rules = [_rule("a", "log errors"), _rule("b", "log errors early")]
+        rules[1].confidence = 0.5
+        
+        merged, = self.extractor._merge_similar_rules(rules)
+        self.assertEqual(merged.id, "a")
+        self.assertEqual(set(merged.action.description.split("; ")),
+                         {"Rule about log errors", "Rule about log errors early"})
+        self.assertAlmostEqual(merged.confidence, 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
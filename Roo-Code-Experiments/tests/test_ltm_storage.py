@@ -0,0 +1,237 @@
+"""Tests for SimulatedLTMStorage persistence."""
+
+import json
+import logging
+import shutil
+import tempfile
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType
+from ltm_pipeline.retrieval_application import SimulatedLTMStorage
+
+
+def _make_rule(i: int) -> Rule:
+    """Create a distinct keyword rule."""
+    return Rule(
+        id=f"rule-{i}",
+        match_criteria=MatchCriteria(MatchType.KEYWORD, f"variables word{i}"),
+        action=Action(ActionType.NAMING, f"Use camelCase for thing{i}")
+    )
+
+
+class TestStoragePersistence(unittest.TestCase):
+    """Round trips through the snapshot and the write-ahead log."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.storage_path = self.temp_dir / "ltm.json"
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.temp_dir)
+    
+    def _open(self, **kwargs) -> SimulatedLTMStorage:
+        return SimulatedLTMStorage(str(self.storage_path), **kwargs)
+    
+    def _store(self, count: int, compaction_threshold: int) -> SimulatedLTMStorage:
+        storage = self._open(wal_compaction_threshold=compaction_threshold)
+        storage.store_rules([_make_rule(i) for i in range(count)])
+        storage.flush()
+        return storage
+    
+    def test_snapshot_and_wal_round_trip(self):
+        original = self._store(10, compaction_threshold=4)
+        
+        # Eight rules are in the snapshot, the last two only in the log
+        snapshot = json.loads(self.storage_path.read_text(encoding="utf-8"))
+        self.assertEqual(snapshot["format"], 2)
+        self.assertEqual(len(snapshot["rules"]), 8)
+        self.assertEqual(len(self.storage_path.with_suffix(".wal").read_text(encoding="utf-8").splitlines()), 2)
+        
+        loaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(sorted(loaded.rules), sorted(original.rules))
+        for rule_id, rule in original.rules.items():
+            self.assertEqual(loaded.rules[rule_id].to_dict(), rule.to_dict())
+        self.assertEqual(loaded._wal_entries, 2)
+        self.assertEqual([rule.id for rule in loaded.search_rules("word9")], ["rule-9"])
+        self.assertEqual([rule.id for rule in loaded.search_rules("word1")], ["rule-1"])
+    
+    def test_wal_replay_without_snapshot(self):
+        self._store(3, compaction_threshold=100)
+        self.assertFalse(self.storage_path.exists())
+        
+        loaded = self._open()
+        self.assertEqual(sorted(loaded.rules), ["rule-0", "rule-1", "rule-2"])
+        self.assertEqual([rule.id for rule in loaded.search_rules("word2")], ["rule-2"])
+    
+    def test_torn_last_wal_line_keeps_snapshot(self):
+        self._store(10, compaction_threshold=4)
+        wal_path = self.storage_path.with_suffix(".wal")
+        with open(wal_path, "a", encoding="utf-8") as f:
+            f.write('{"id": "rule-10", "rule": {"id": "ru')
+        
+        loaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(len(loaded.rules), 10)
+        self.assertNotIn("rule-10", loaded.rules)
+        self.assertTrue(wal_path.read_text(encoding="utf-8").endswith("\n"))
+        
+        # Appends after the truncated line replay cleanly
+        loaded.store_rule(_make_rule(10))
+        loaded.flush()
+        reloaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(len(reloaded.rules), 11)
+    
+    def test_snapshot_keeps_updated_rule(self):
+        # Every store writes a full snapshot
+        storage = self._store(3, compaction_threshold=1)
+        rule = storage.rules["rule-0"]
+        rule.action.description = "Use snake_case everywhere"
+        storage.store_rule(rule)
+        storage.flush()
+        self.assertTrue(self.storage_path.exists())
+        
+        loaded = self._open()
+        self.assertEqual(loaded.rules["rule-0"].action.description, "Use snake_case everywhere")
+    
+    def test_snapshot_ignores_later_edits(self):
+        storage = self._open(wal_compaction_threshold=1)
+        rule = _make_rule(0)
+        rule.metadata["version"] = 1
+        storage.store_rule(rule)
+        rule.metadata["version"] = 2
+        storage.flush()
+        
+        snapshot = json.loads(self.storage_path.read_text(encoding="utf-8"))
+        metadata = snapshot["rules"][0][snapshot["rule_fields"].index("metadata")]
+        self.assertEqual(metadata["version"], 1)
+    
+    def test_snapshot_drops_replaced_rule_postings(self):
+        storage = self._open(wal_compaction_threshold=2)
+        storage.store_rule(Rule(id="a", match_criteria=MatchCriteria(MatchType.KEYWORD, "python"),
+                                action=Action(ActionType.STYLE, "Use spaces")))
+        storage.store_rule(Rule(id="a", match_criteria=MatchCriteria(MatchType.KEYWORD, "rust"),
+                                action=Action(ActionType.STYLE, "Use spaces")))
+        storage.flush()
+        
+        loaded = self._open()
+        self.assertEqual(loaded.search_rules("python"), [])
+        self.assertEqual([rule.id for rule in loaded.search_rules("rust")], ["a"])
+    
+    def test_crash_between_replacements_keeps_rules(self):
+        storage = self._store(10, compaction_threshold=4)
+        
+        # The indices are replaced, then the process dies before the snapshot is
+        real_replace = os.replace
+        replaced = []
+        
+        def crash_on_snapshot(src, dst):
+            if replaced:
+                raise OSError("simulated crash")
+            replaced.append(dst)
+            real_replace(src, dst)
+        
+        with mock.patch("os.replace", side_effect=crash_on_snapshot):
+            storage.store_rules([_make_rule(10), _make_rule(11)])
+            with self.assertRaises(OSError):
+                storage.flush()
+        self.assertEqual(len(replaced), 1)
+        self.assertEqual(len(json.loads(self.storage_path.read_text(encoding="utf-8"))["rules"]), 8)
+        
+        # The old snapshot and the log still hold every rule, and the newer
+        # indices are not decoded against the older snapshot
+        loaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(sorted(loaded.rules), sorted(f"rule-{i}" for i in range(12)))
+        for i in (0, 7, 8, 11):
+            self.assertEqual([rule.id for rule in loaded.search_rules(f"word{i}")], [f"rule-{i}"])
+        self.assertEqual(sorted(path.name for path in self.temp_dir.iterdir()),
+                         ["ltm.indices", "ltm.json", "ltm.wal"])
+    
+    def test_failed_snapshot_write_keeps_old_files(self):
+        storage = self._store(10, compaction_threshold=4)
+        snapshot_text = self.storage_path.read_text(encoding="utf-8")
+        
+        # The write dies before the temporary file is complete
+        with mock.patch("os.fsync", side_effect=OSError("simulated crash")):
+            storage.store_rules([_make_rule(10), _make_rule(11)])
+            with self.assertRaises(OSError):
+                storage.flush()
+        self.assertEqual(self.storage_path.read_text(encoding="utf-8"), snapshot_text)
+        
+        loaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(len(loaded.rules), 12)
+        self.assertEqual([rule.id for rule in loaded.search_rules("word3")], ["rule-3"])
+        self.assertEqual(sorted(path.name for path in self.temp_dir.iterdir()),
+                         ["ltm.indices", "ltm.json", "ltm.wal"])
+    
+    def test_failed_snapshot_keeps_batched_log_lines(self):
+        storage = self._store(10, compaction_threshold=4)
+        
+        # The writer coalesced a log line with a snapshot that then fails
+        line = json.dumps({"id": "rule-10", "rule": _make_rule(10).to_dict()})
+        with mock.patch("os.fsync", side_effect=OSError("simulated crash")):
+            with self.assertRaises(OSError):
+                storage._write_jobs([("wal", line), ("snapshot", "{}", "{}")])
+        
+        loaded = self._open(wal_compaction_threshold=4)
+        self.assertEqual(len(loaded.rules), 11)
+        self.assertEqual([rule.id for rule in loaded.search_rules("word10")], ["rule-10"])
+    
+    def test_flush_raises_write_errors(self):
+        # The snapshot directory cannot be created under a regular file
+        blocker = self.temp_dir / "blocker"
+        blocker.write_text("", encoding="utf-8")
+        storage = SimulatedLTMStorage(str(blocker / "ltm.json"))
+        self.assertTrue(storage.store_rule(_make_rule(0)))
+        
+        with self.assertRaises(OSError):
+            storage.flush()
+        storage.flush()
+    
+    def test_close_stops_writer(self):
+        storage = self._store(3, compaction_threshold=100)
+        writer = storage._writer
+        storage.close()
+        self.assertFalse(writer.is_alive())
+        self.assertIsNone(storage._writer)
+        
+        # Writing again restarts the writer
+        storage.store_rule(_make_rule(3))
+        storage.close()
+        self.assertEqual(len(self._open().rules), 4)
+    
+    def test_clear_removes_persisted_rules(self):
+        storage = self._store(10, compaction_threshold=4)
+        storage.clear()
+        
+        self.assertEqual(list(self.temp_dir.iterdir()), [])
+        self.assertEqual(len(self._open().rules), 0)
+
+
+class TestStorageIndexing(unittest.TestCase):
+    """Index maintenance as rules are stored and replaced."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_restoring_changed_rule_reindexes_it(self):
+        storage = SimulatedLTMStorage(index_update_frequency=1)
+        rule = _make_rule(0)
+        storage.store_rule(rule)
+        self.assertEqual(storage.search_rules("everywhere"), [])
+        
+        rule.action.description = "Use snake_case everywhere"
+        storage.store_rule(rule)
+        self.assertEqual(storage.search_rules("everywhere"), [rule])
+        self.assertEqual(storage.search_rules("thing0"), [])
+        self.assertEqual(storage.retrieve_relevant_rules({"keywords": ["everywhere"]}), [rule])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Tests for the core data models."""
+
+import pickle
+import unittest
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType
+
+
+def _description_words(rule: Rule) -> frozenset:
+    return frozenset(rule.action.description.split())
+
+
+class TestRuleDerived(unittest.TestCase):
+    """Values cached with Rule.derived."""
+    
+    def setUp(self):
+        self.rule = Rule(
+            id="rule-0",
+            match_criteria=MatchCriteria(MatchType.KEYWORD, "variables", {"language": "python"}),
+            action=Action(ActionType.NAMING, "Use snake_case")
+        )
+    
+    def test_value_is_computed_once(self):
+        calls = []
+        compute = lambda rule: calls.append(rule) or len(calls)
+        
+        self.assertEqual(self.rule.derived("count", compute), 1)
+        self.assertEqual(self.rule.derived("count", compute), 1)
+        self.assertEqual(len(calls), 1)
+    
+    def test_reassigned_field_drops_values(self):
+        self.assertEqual(self.rule.derived("words", _description_words), {"Use", "snake_case"})
+        
+        self.rule.action.description = "Use camelCase"
+        self.assertEqual(self.rule.derived("words", _description_words), {"Use", "camelCase"})
+        
+        self.rule.action = Action(ActionType.NAMING, "Prefer PascalCase")
+        self.assertEqual(self.rule.derived("words", _description_words), {"Prefer", "PascalCase"})
+    
+    def test_reassigned_rule_field_drops_values(self):
+        confidence = lambda rule: rule.confidence
+        self.assertEqual(self.rule.derived("confidence", confidence), 1.0)
+        
+        self.rule.confidence = 0.5
+        self.assertEqual(self.rule.derived("confidence", confidence), 0.5)
+    
+    def test_building_other_rules_keeps_values(self):
+        calls = []
+        compute = lambda rule: calls.append(rule) or len(calls)
+        self.rule.derived("count", compute)
+        
+        Rule(match_criteria=MatchCriteria(MatchType.KEYWORD, "tabs"), action=Action(ActionType.STYLE, "Use tabs"))
+        self.assertEqual(self.rule.derived("count", compute), 1)
+        self.assertEqual(len(calls), 1)
+    
+    def test_clear_derived_after_in_place_change(self):
+        language = lambda rule: rule.match_criteria.context["language"]
+        self.assertEqual(self.rule.derived("language", language), "python")
+        
+        self.rule.match_criteria.context["language"] = "go"
+        self.rule.clear_derived()
+        self.assertEqual(self.rule.derived("language", language), "go")
+    
+    def test_derived_values_are_not_pickled(self):
+        self.rule.derived("words", _description_words)
+        
+        restored = pickle.loads(pickle.dumps(self.rule))
+        self.assertEqual(restored, self.rule)
+        self.assertNotIn("_derived", restored.__dict__)
+
+
+if __name__ == "__main__":
+    unittest.main()
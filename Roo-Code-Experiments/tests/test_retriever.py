@@ -0,0 +1,111 @@
+"""Tests for RuleRetriever similarity scoring."""
+
+import logging
+import re
+import unittest
+
+from ltm_pipeline.common.models import Rule, MatchCriteria, Action, MatchType, ActionType, Task
+from ltm_pipeline.retrieval_application import SimulatedLTMStorage, RuleRetriever
+
+
+_STOP_WORDS = {
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "shall", "to", "of", "in", "for",
+    "on", "with", "at", "by", "from", "about", "as", "and", "or", "but",
+    "if", "then", "else", "when", "where", "how", "why", "what", "which",
+    "who", "whom", "this", "that", "these", "those", "it", "its"
+}
+
+
+def _keywords(text: str) -> set:
+    """Extract keywords the way the retriever has always done."""
+    words = [w for w in re.findall(r'\b\w+\b', text.lower()) if len(w) > 2 and w not in _STOP_WORDS]
+    return set(list(dict.fromkeys(words))[:10])
+
+
+def _reference_similarity(task: Task, rule: Rule) -> float:
+    """Score a task and rule with the original one-pair-at-a-time formula."""
+    score = 0.0
+    if task.language and rule.match_criteria.context:
+        rule_lang = rule.match_criteria.context.get("language", "").lower()
+        if rule_lang == task.language.lower():
+            score += 0.3
+        elif rule_lang == "general" or not rule_lang:
+            score += 0.1
+    
+    task_type_keywords = {
+        "code_generation": ["create", "implement", "write", "generate"],
+        "refactoring": ["refactor", "improve", "optimize", "clean"],
+        "debugging": ["fix", "debug", "error", "issue"],
+        "testing": ["test", "verify", "validate", "check"]
+    }
+    if task.type in task_type_keywords:
+        if any(kw in rule.action.description.lower() for kw in task_type_keywords[task.type]):
+            score += 0.2
+    
+    task_keywords, rule_keywords = _keywords(task.description), _keywords(rule.action.description)
+    if task_keywords and rule_keywords:
+        overlap = len(task_keywords & rule_keywords)
+        if overlap > 0:
+            score += min(0.3 * overlap / min(len(task_keywords), len(rule_keywords)), 0.3)
+    
+    if task.context and rule.match_criteria.value:
+        if rule.match_criteria.value.lower() in str(task.context).lower():
+            score += 0.2
+    
+    return min(score, 1.0)
+
+
+class TestBatchScoring(unittest.TestCase):
+    """_score_rules against per-rule scoring."""
+    
+    RULES = [
+        Rule(id="python", match_criteria=MatchCriteria(MatchType.KEYWORD, "Variables", {"language": "Python"}),
+             action=Action(ActionType.NAMING, "Create variables in snake_case")),
+        Rule(id="general", match_criteria=MatchCriteria(MatchType.PATTERN, "django", {"language": "general"}),
+             action=Action(ActionType.STRUCTURE, "Refactor views and clean up the models")),
+        Rule(id="no-language", match_criteria=MatchCriteria(MatchType.CONTEXT, "", {"framework": "django"}),
+             action=Action(ActionType.BEHAVIOR, "Fix every error before you test the login flow")),
+        Rule(id="no-context", match_criteria=MatchCriteria(MatchType.KEYWORD, "login"),
+             action=Action(ActionType.BEHAVIOR, "Validate login input and check error codes"))
+    ]
+    
+    TASKS = [
+        Task(id="generate", type="code_generation", language="python",
+             description="Create the user profile variables", context={"variables_needed": ["userName"]}),
+        Task(id="debug", type="debugging", language="Java", description="Fix the login error",
+             context={"framework": "django"}),
+        Task(id="refactor", type="refactoring", language="", description="Clean up the django views"),
+        Task(id="test", type="testing", language="go", description="")
+    ]
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.retriever = RuleRetriever(SimulatedLTMStorage())
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_batch_scores_match_per_rule_scores(self):
+        for task in self.TASKS:
+            with self.subTest(task=task.id):
+                scores = self.retriever._score_rules(task, self.RULES)
+                self.assertEqual(scores, [self.retriever._calculate_task_rule_similarity(task, rule)
+                                          for rule in self.RULES])
+                for rule, score in zip(self.RULES, scores):
+                    self.assertAlmostEqual(score, _reference_similarity(task, rule))
+    
+    def test_changed_rule_is_scored_again(self):
+        rule = Rule(id="rule", match_criteria=MatchCriteria(MatchType.KEYWORD, "views"),
+                    action=Action(ActionType.STYLE, "Use tabs"))
+        task = self.TASKS[2]
+        self.assertAlmostEqual(self.retriever._score_rules(task, [rule])[0], _reference_similarity(task, rule))
+        
+        rule.action.description = "Refactor the django views"
+        self.assertAlmostEqual(self.retriever._score_rules(task, [rule])[0], _reference_similarity(task, rule))
+        self.assertGreater(self.retriever._score_rules(task, [rule])[0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()